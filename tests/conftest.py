@@ -0,0 +1,6 @@
+# std
+import sys
+
+
+# asynchronous generators are only available from python 3.6
+collect_ignore = [] if sys.version_info[:2] >= (3, 6) else ['test_aio.py']
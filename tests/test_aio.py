@@ -0,0 +1,68 @@
+# std
+import asyncio
+# 3rd party
+from hypothesis import given, strategies as st
+# local
+from xsorted.aio import axsorted
+
+
+async def _aiter(things):
+    for thing in things:
+        await asyncio.sleep(0)
+        yield thing
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _collect(asynchronous_iterable):
+    return [x async for x in asynchronous_iterable]
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_axsorted(things, reverse):
+    """
+    Verify the property that axsorted == sorted.
+    """
+    actual = _run(_collect(axsorted(_aiter(things), reverse=reverse, partition_size=4,
+                                    batch_size=3)))
+    assert actual == sorted(things, reverse=reverse)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_axsorted_stable(things, reverse):
+    """
+    Verify that axsorted gives a stable sort.
+    """
+    def key(x):
+        return x // 3
+
+    actual = _run(_collect(axsorted(_aiter(things), key=key, reverse=reverse, partition_size=4)))
+    assert actual == sorted(things, key=key, reverse=reverse)
+
+
+def test_axsorted_does_not_block_event_loop():
+    """
+    Verify that other tasks keep running on the event loop while sorting.
+    """
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def sort():
+        task = asyncio.ensure_future(ticker())
+        try:
+            return await _collect(axsorted(_aiter(range(5000, 0, -1)), partition_size=100))
+        finally:
+            task.cancel()
+
+    assert _run(sort()) == list(range(1, 5001))
+    assert len(ticks) > 50
@@ -0,0 +1,85 @@
+# std
+import os
+# 3rd party
+import pytest
+from hypothesis import given, strategies as st
+# local
+np = pytest.importorskip('numpy')
+from xsorted.arrays import (  # noqa: E402 numpy must be importable before importing arrays
+    xsorted_array, _split_array, _merge_arrays, _load_array, _dump_array,
+)
+
+
+@given(
+    things=st.lists(st.integers(min_value=-2 ** 31, max_value=2 ** 31)),
+    reverse=st.booleans(),
+    partition_size=st.integers(min_value=1, max_value=10),
+    batch_size=st.integers(min_value=1, max_value=10),
+)
+def test_properties_xsorted_array(things, reverse, partition_size, batch_size):
+    """
+    Verify the property that xsorted_array == sorted for an iterable of integers.
+    """
+    actual = xsorted_array(things, dtype=np.int64, reverse=reverse,
+                           partition_size=partition_size, batch_size=batch_size)
+    assert list(actual) == sorted(things, reverse=reverse)
+
+
+@given(
+    things=st.lists(st.floats(allow_nan=False)),
+    reverse=st.booleans(),
+    partition_size=st.integers(min_value=1, max_value=10),
+)
+def test_properties_xsorted_array_from_array(things, reverse, partition_size):
+    """
+    Verify the property that xsorted_array == sorted for an array of floats, returned in batches.
+    """
+    batches = xsorted_array(np.array(things, dtype=float), reverse=reverse, batches=True,
+                            partition_size=partition_size, batch_size=3)
+    batches = list(batches)
+    assert all(isinstance(batch, np.ndarray) for batch in batches)
+    actual = np.concatenate(batches).tolist() if batches else []
+    assert actual == sorted(things, reverse=reverse)
+
+
+def test_split_array_key_unsupported():
+    """
+    Verify that a key is rejected since values are compared directly.
+    """
+    with pytest.raises(ValueError):
+        _split_array(_dump_array, 10, [1, 2, 3], key=abs)
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_merge_arrays(reverse):
+    """
+    Verify that batches of sorted arrays which overlap, and an empty array, are merged into sorted
+    batches.
+    """
+    arrays = [[[1, 4], [6, 9]], [[2, 3, 10]], [], [[5], [7, 8]]]
+    if reverse:
+        arrays = [[np.array(batch[::-1]) for batch in array[::-1]] for array in arrays]
+    else:
+        arrays = [[np.array(batch) for batch in array] for array in arrays]
+    merged = _merge_arrays(iter, arrays, reverse=reverse)
+    actual = np.concatenate(list(merged)).tolist()
+    assert actual == sorted(range(1, 11), reverse=reverse)
+
+
+def test_dump_load_array_cleanup():
+    """
+    Verify that arrays are loaded in batches and that the temporary file is removed.
+    """
+    path = _dump_array(np.arange(10))
+    assert [batch.tolist() for batch in _load_array(path, batch_size=4)] == [
+        [0, 1, 2, 3], [4, 5, 6, 7], [8, 9],
+    ]
+    assert not os.path.exists(path)
+
+
+def test_benchmark_xsorted_array(benchmark):
+    """
+    Benchmark sorting floats using xsorted_array, for comparison with the xsorted benchmarks.
+    """
+    values = np.random.RandomState(0).random_sample(int(1e6))
+    benchmark(lambda: list(xsorted_array(values, batches=True, partition_size=int(1e5))))
@@ -0,0 +1,215 @@
+"""
+Benchmark matrix of ``xsorted`` over the kinds of data, sizes, partition sizes, presortedness and
+key functions which are sorted in practice.
+
+Saved runs are specific to the machine and python version, so first save a baseline of the
+revision to compare against (``tox -e benchmark-baseline``)::
+
+    py.test tests/test_benchmarks.py --benchmark-only --benchmark-autosave
+
+Then run the benchmarks and compare them with the latest run saved in ``.benchmarks``, failing if
+the fastest round of any benchmark has regressed by more than 10% (``tox -e benchmark``)::
+
+    py.test tests/test_benchmarks.py --benchmark-only --benchmark-compare \
+        --benchmark-compare-fail=min:10%
+
+Sizes at which sorting is bound by disk are only benchmarked when the ``XSORTED_BENCHMARK_LARGE``
+environment variable is set.
+"""
+# std
+import os
+import sys
+import pickle
+import random
+import tempfile
+import subprocess
+import collections
+from functools import partial
+from operator import itemgetter
+# 3rd party
+import pytest
+# local
+from xsorted import xsorter, _dump, _load
+from . util import random_items, presorted
+
+
+# keys used for the kinds of data which can not be compared directly.
+_KEYS = {'dicts': itemgetter('id')}
+# number of items sorted when benchmarking at disk bound sizes.
+_LARGE_SIZE = int(1e7)
+# measures the peak resident memory of sorting in a process of it's own. On linux ru_maxrss is kept
+# across exec, so it would include the memory of the test process, VmHWM is used instead.
+_MEMORY_SCRIPT = '''
+import sys
+import resource
+from xsorted import xsorted
+from tests.util import random_strings
+sort = {'none': iter, 'sorted': sorted, 'xsorted': xsorted}[sys.argv[1]]
+for _ in sort(random_strings(num=int(sys.argv[2]), length=1000)):
+    pass
+try:
+    with open('/proc/self/status') as status:
+        print(next(int(line.split()[1]) for line in status if line.startswith('VmHWM:')))
+except IOError:
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+def do_benchmark(benchmark, sort, items, key=None):
+    """
+    Benchmark iterating through items sorted using sort.
+    """
+    def do():
+        for _ in sort(items, key=key):
+            pass
+    benchmark(do)
+
+
+@pytest.mark.benchmark(group='kind')
+@pytest.mark.parametrize('order', ['random', 'sorted', 'reversed', 'nearly'])
+@pytest.mark.parametrize('kind', ['ints', 'floats', 'strings', 'tuples', 'dicts'])
+def test_benchmark_kind(kind, order, benchmark):
+    """
+    Benchmark sorting each kind of data in each order.
+    """
+    key = _KEYS.get(kind)
+    items = presorted(list(random_items(kind, int(1e4))), order, key)
+    do_benchmark(benchmark, xsorter(partition_size=1024), items, key)
+
+
+@pytest.mark.benchmark(group='partition_size')
+@pytest.mark.parametrize('partition_size', [256, 4096, 65536])
+@pytest.mark.parametrize('size', [int(1e3), int(1e4), int(1e5)])
+def test_benchmark_size(size, partition_size, benchmark):
+    """
+    Benchmark sorting increasing numbers of floats with different partition sizes.
+    """
+    items = list(random_items('floats', size))
+    do_benchmark(benchmark, xsorter(partition_size=partition_size), items)
+
+
+@pytest.mark.benchmark(group='key')
+@pytest.mark.parametrize('key', [
+    None,
+    itemgetter(1),
+    lambda item: item[1].lower(),
+], ids=['none', 'itemgetter', 'lambda'])
+@pytest.mark.parametrize('store_keys', [False, True])
+def test_benchmark_key(key, store_keys, benchmark):
+    """
+    Benchmark sorting tuples by key functions of increasing cost, with and without storing keys.
+    """
+    items = list(random_items('tuples', int(1e4)))
+    do_benchmark(benchmark, xsorter(partition_size=1024, store_keys=store_keys), items, key)
+
+
+def _dump_per_item(partition):
+    """
+    Dump a partition pickling one item at a time, the spill format used before block pickling.
+    """
+    with tempfile.NamedTemporaryFile(delete=False) as fileobj:
+        for item in partition:
+            pickle.dump(item, fileobj)
+        return fileobj.name
+
+
+def _load_per_item(partition_id):
+    """
+    Load a partition dumped by ``_dump_per_item``.
+    """
+    try:
+        with open(partition_id, 'rb') as fileobj:
+            while True:
+                try:
+                    yield pickle.load(fileobj)
+                except EOFError:
+                    return
+    finally:
+        os.unlink(partition_id)
+
+
+@pytest.mark.benchmark(group='spill_format')
+@pytest.mark.parametrize('spill_format', ['block', 'item'])
+def test_benchmark_spill_format(spill_format, benchmark):
+    """
+    Benchmark the throughput of the block spill format against pickling one item at a time when
+    sorting small items.
+    """
+    if spill_format == 'block':
+        sort = xsorter()
+    else:
+        sort = xsorter(dump=_dump_per_item, load=_load_per_item)
+    items = list(random_items('floats', int(1e5)))
+    do_benchmark(benchmark, sort, items)
+
+
+@pytest.mark.benchmark(group='codec')
+@pytest.mark.parametrize('codec', [None, 'zlib', 'bz2', 'lzma'])
+def test_benchmark_codec(codec, benchmark):
+    """
+    Benchmark the throughput of sorting text records with each codec, recording the number of bytes
+    written to disk in the benchmark extra info.
+    """
+    counts = collections.Counter()
+
+    def dump(partition):
+        partition_id = _dump(partition, codec=codec)
+        counts['bytes_written'] += os.path.getsize(partition_id)
+        return partition_id
+
+    def sort(items, key=None):
+        counts['sorts'] += 1
+        return xsorter(dump=dump, load=partial(_load, codec=codec))(items, key=key)
+
+    rng = random.Random(0)
+    words = [''.join(rng.choice('etaoin shrdlu') for _ in range(8)) for _ in range(500)]
+    records = [' '.join(rng.choice(words) for _ in range(20)) for _ in range(int(2e4))]
+    do_benchmark(benchmark, sort, records)
+    benchmark.extra_info['bytes_written_per_sort'] = counts['bytes_written'] // counts['sorts']
+
+
+@pytest.mark.skipif('XSORTED_BENCHMARK_LARGE' not in os.environ,
+                    reason='set XSORTED_BENCHMARK_LARGE to benchmark disk bound sizes')
+@pytest.mark.benchmark(group='large')
+@pytest.mark.parametrize('kind', ['floats', 'strings'])
+def test_benchmark_large(kind, benchmark):
+    """
+    Benchmark sorting more items than fit in memory comfortably, generated while being sorted.
+    """
+    def do(items):
+        for _ in xsorter(partition_size=1 << 16)(items):
+            pass
+    benchmark.pedantic(do, setup=lambda: ((random_items(kind, _LARGE_SIZE),), {}), rounds=1)
+
+
+def peak_memory(sort, num):
+    """
+    Measure the peak resident memory of sorting num 1KB strings in a new python process, so that
+    the measurement does not slow down the sort or include memory used by the test run.
+
+    :param sort: ``'sorted'``, ``'xsorted'`` or ``'none'`` to iterate the strings without sorting.
+
+    :return: The peak resident memory of the process, in KB on linux.
+    """
+    root = os.path.join(os.path.dirname(__file__), '..')
+    output = subprocess.check_output([sys.executable, '-c', _MEMORY_SCRIPT, sort, str(num)],
+                                     cwd=root)
+    return int(output)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='resource is not available on windows')
+def test_peak_memory():
+    """
+    Verify that sorting with ``xsorted`` uses less than half the memory which ``sorted`` uses,
+    measured in separate processes.
+
+    ``sorted`` holds all of the 50MB of strings. ``xsorted`` holds a partition being sorted and,
+    while merging, a block of ``_BLOCK_SIZE`` items from each of the ~50 partitions, which is
+    about 6MB of 1KB strings, so it uses roughly a quarter of the memory of ``sorted`` rather
+    than a small fraction of it.
+    """
+    num = int(1e5 / 2)
+    baseline = peak_memory('none', num)
+    used_by_sorted = peak_memory('sorted', num) - baseline
+    used_by_xsorted = peak_memory('xsorted', num) - baseline
+    assert used_by_xsorted * 2 < used_by_sorted
@@ -0,0 +1,49 @@
+# 3rd party
+import pytest
+from six import StringIO
+from hypothesis import given, strategies as st
+# local
+from xsorted.csvsort import xsort_csv
+
+
+def _xsort_csv(data, *args, **kwargs):
+    """
+    Sort csv data using xsort_csv and return the text written.
+    """
+    fileobj_out = StringIO()
+    xsort_csv(StringIO(data), fileobj_out, *args, **kwargs)
+    return fileobj_out.getvalue()
+
+
+@given(
+    rows=st.lists(st.tuples(st.integers(), st.text(alphabet='abc, "'))),
+    reverse=st.booleans(),
+)
+def test_properties_xsort_csv(rows, reverse):
+    """
+    Verify the property that sorting csv rows by a converted column is the same as sorted.
+    """
+    data = 'number,text\r\n' + ''.join(
+        '{0},"{1}"\r\n'.format(n, t.replace('"', '""')) for n, t in rows)
+    actual = _xsort_csv(data, ['number'], converters={'number': int}, reverse=reverse,
+                        partition_size=3)
+    expected = sorted(rows, key=lambda row: row[0], reverse=reverse)
+    assert actual.splitlines()[0] == 'number,text'
+    assert [int(line.split(',')[0]) for line in actual.splitlines()[1:]] == [n for n, _ in expected]
+
+
+def test_xsort_csv_columns_by_index_without_header():
+    """
+    Verify that files without a header can be sorted by multiple columns given by index.
+    """
+    data = 'b,2\r\na,10\r\nb,1\r\n'
+    actual = _xsort_csv(data, [0, 1], converters={1: int}, header=False)
+    assert actual == 'a,10\r\nb,1\r\nb,2\r\n'
+
+
+def test_xsort_csv_unknown_column():
+    """
+    Verify that sorting by a column which is not in the header is rejected.
+    """
+    with pytest.raises(ValueError):
+        _xsort_csv('a,b\r\n1,2\r\n', ['c'])
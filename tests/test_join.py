@@ -0,0 +1,79 @@
+# std
+from operator import itemgetter
+# 3rd party
+import pytest
+from hypothesis import given, strategies as st
+# local
+from xsorted.join import xjoin, _GroupBuffer
+
+
+def _nested_loop_join(left, right, key, how):
+    """
+    Join left and right by comparing every pair of items, the expected result of xjoin.
+    """
+    joined = [(left_item, right_item) for left_item in left for right_item in right
+              if key(left_item) == key(right_item)]
+    if how in ('left', 'outer'):
+        joined += [(left_item, None) for left_item in left
+                   if not any(key(left_item) == key(right_item) for right_item in right)]
+    if how in ('right', 'outer'):
+        joined += [(None, right_item) for right_item in right
+                   if not any(key(left_item) == key(right_item) for left_item in left)]
+    return joined
+
+
+def _pair_key(pair):
+    """
+    Sort key for comparing lists of joined pairs which may contain ``None``.
+    """
+    return tuple((item is None, item or ()) for item in pair)
+
+
+items = st.lists(st.tuples(st.integers(min_value=0, max_value=5), st.integers()))
+
+
+@given(left=items, right=items, how=st.sampled_from(['inner', 'left', 'right', 'outer']),
+       group_size=st.integers(min_value=1, max_value=3))
+def test_properties_xjoin(left, right, how, group_size):
+    """
+    Verify the property that xjoin returns the same pairs as a nested loop join, in order of their
+    key.
+    """
+    key = itemgetter(0)
+    actual = list(xjoin(left, right, key, how=how, group_size=group_size, partition_size=4))
+    expected = _nested_loop_join(left, right, key, how)
+    assert sorted(actual, key=_pair_key) == sorted(expected, key=_pair_key)
+    keys = [key(left_item if left_item is not None else right_item)
+            for left_item, right_item in actual]
+    assert keys == sorted(keys)
+
+
+def test_xjoin_right_key():
+    """
+    Verify that the right items can have a different key to the left items.
+    """
+    left = [('a', 1), ('b', 2)]
+    right = [(2, 'x'), (1, 'y'), (1, 'z')]
+    actual = list(xjoin(left, right, itemgetter(1), itemgetter(0)))
+    assert actual == [(('a', 1), (1, 'y')), (('a', 1), (1, 'z')), (('b', 2), (2, 'x'))]
+
+
+def test_group_buffer_spills_large_groups():
+    """
+    Verify that a group larger than max_items is spilled to disk and can be iterated repeatedly.
+    """
+    buffered = _GroupBuffer(iter(range(10)), max_items=4)
+    try:
+        assert buffered.fileobj is not None
+        assert len(buffered.items) <= 4
+        assert list(buffered) == list(buffered) == list(range(10))
+    finally:
+        buffered.close()
+
+
+def test_xjoin_invalid_how():
+    """
+    Verify that an unknown join is rejected.
+    """
+    with pytest.raises(ValueError):
+        xjoin([], [], itemgetter(0), how='cross')
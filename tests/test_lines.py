@@ -0,0 +1,65 @@
+# std
+import os
+import shutil
+import tempfile
+# 3rd party
+from hypothesis import given, settings, strategies as st
+# local
+from xsorted.lines import xsort_lines
+
+
+def _xsort_lines(data, **kwargs):
+    """
+    Sort data using xsort_lines and return the bytes written.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        path_in, path_out = os.path.join(directory, 'in'), os.path.join(directory, 'out')
+        with open(path_in, 'wb') as fileobj:
+            fileobj.write(data)
+        xsort_lines(path_in, path_out, **kwargs)
+        with open(path_out, 'rb') as fileobj:
+            return fileobj.read()
+    finally:
+        shutil.rmtree(directory)
+
+
+@settings(deadline=None)
+@given(
+    lines=st.lists(st.binary().map(lambda line: line.replace(b'\n', b''))),
+    newline_at_end=st.booleans(),
+    reverse=st.booleans(),
+    partition_size=st.integers(min_value=1, max_value=10),
+    buffer_size=st.integers(min_value=1, max_value=20),
+)
+def test_properties_xsort_lines(lines, newline_at_end, reverse, partition_size, buffer_size):
+    """
+    Verify the property that sorting the lines of a file is the same as sorting the lines with
+    sorted and that every line of the output is terminated by a newline.
+    """
+    data = b'\n'.join(lines) + (b'\n' if newline_at_end and lines else b'')
+    expected_lines = data.split(b'\n')
+    if expected_lines[-1] == b'':
+        expected_lines.pop()
+    expected = b''.join(line + b'\n' for line in sorted(expected_lines, reverse=reverse))
+    actual = _xsort_lines(data, reverse=reverse, partition_size=partition_size,
+                          buffer_size=buffer_size)
+    assert actual == expected
+
+
+def test_xsort_lines_key_encoding():
+    """
+    Verify that a key is called with the decoded line and that the lines are written as read.
+    """
+    data = u'béta,2\nalpha,3\ngamma,1\n'.encode('utf-8')
+    actual = _xsort_lines(data, key=lambda line: int(line.split(u',')[1]), encoding='utf-8',
+                          partition_size=1)
+    assert actual == u'gamma,1\nbéta,2\nalpha,3\n'.encode('utf-8')
+
+
+def test_xsort_lines_compares_lines_without_newlines():
+    """
+    Verify that a line which is a prefix of another line sorts first, even when the other line
+    continues with a character which is smaller than a newline.
+    """
+    assert _xsort_lines(b'a\tb\na\n') == b'a\na\tb\n'
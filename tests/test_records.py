@@ -0,0 +1,88 @@
+# std
+import os
+import shutil
+import struct
+import tempfile
+# 3rd party
+import pytest
+from hypothesis import given, settings, strategies as st
+# local
+import xsorted.records
+from xsorted.records import xsort_records
+
+
+RECORD = struct.Struct('>iH10s')
+
+
+def _records(path):
+    with open(path, 'rb') as fileobj:
+        data = fileobj.read()
+    return [data[i:i + RECORD.size] for i in range(0, len(data), RECORD.size)]
+
+
+@settings(deadline=None)
+@given(
+    records=st.lists(st.tuples(
+        st.integers(min_value=-2 ** 31, max_value=2 ** 31 - 1),
+        st.integers(min_value=0, max_value=2 ** 16 - 1),
+        st.binary(min_size=10, max_size=10),
+    )),
+    reverse=st.booleans(),
+    partition_size=st.integers(min_value=1, max_value=10),
+)
+def test_properties_xsort_records(records, reverse, partition_size):
+    """
+    Verify the property that sorting a file of records by a field is the same as sorted.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        path_in, path_out = os.path.join(directory, 'in'), os.path.join(directory, 'out')
+        with open(path_in, 'wb') as fileobj:
+            fileobj.write(b''.join(RECORD.pack(*record) for record in records))
+        xsort_records(path_in, path_out, RECORD.size, key_format='>H', key_offset=4,
+                      reverse=reverse, partition_size=partition_size, block_size=3)
+        expected = sorted(_records(path_in), key=lambda x: RECORD.unpack(x)[1], reverse=reverse)
+        assert _records(path_out) == expected
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_xsort_records_by_bytes(tmpdir):
+    """
+    Verify that records are sorted by their bytes when no key format is given.
+    """
+    data = [os.urandom(RECORD.size) for _ in range(1000)]
+    path_in, path_out = str(tmpdir.join('in')), str(tmpdir.join('out'))
+    with open(path_in, 'wb') as fileobj:
+        fileobj.write(b''.join(data))
+    xsort_records(path_in, path_out, RECORD.size, partition_size=100)
+    assert _records(path_out) == sorted(data)
+
+
+def test_xsort_records_invalid_size(tmpdir):
+    """
+    Verify that a file which is not made of whole records is rejected.
+    """
+    path_in = str(tmpdir.join('in'))
+    with open(path_in, 'wb') as fileobj:
+        fileobj.write(b'\0' * (RECORD.size + 1))
+    with pytest.raises(ValueError):
+        xsort_records(path_in, str(tmpdir.join('out')), RECORD.size)
+
+
+def test_xsort_records_error_not_hidden(tmpdir, monkeypatch):
+    """
+    Verify that an error while the records are sorted is raised rather than an error closing the
+    memory map while records are still referenced.
+    """
+    def write_records(fileobj, records, block_size):
+        next(iter(records))
+        raise KeyError('write failed')
+
+    path_in = str(tmpdir.join('in'))
+    with open(path_in, 'wb') as fileobj:
+        fileobj.write(b''.join(RECORD.pack(i, 0, b'') for i in range(100, 0, -1)))
+    monkeypatch.setattr(xsorted.records, '_write_records', write_records)
+    with pytest.raises(KeyError):
+        xsort_records(path_in, str(tmpdir.join('out')), RECORD.size, key_format='>i',
+                      partition_size=10)
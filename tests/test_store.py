@@ -0,0 +1,61 @@
+# std
+import shutil
+import tempfile
+from operator import itemgetter
+# 3rd party
+from hypothesis import given, strategies as st
+# local
+import xsorted.store
+from xsorted.store import xsort_to_store, SortedStore
+
+
+@given(
+    things=st.lists(st.integers(min_value=0, max_value=50)),
+    lo=st.integers(min_value=-1, max_value=51),
+    hi=st.integers(min_value=-1, max_value=51),
+    block_size=st.integers(min_value=1, max_value=5),
+)
+def test_properties_sorted_store(things, lo, hi, block_size):
+    """
+    Verify the property that iterating, seeking and ranges of a store are the same as filtering the
+    sorted items, and that they can be repeated.
+    """
+    path = tempfile.mkdtemp()
+    try:
+        store = xsort_to_store(things, path, block_size=block_size, partition_size=4)
+        expected = sorted(things)
+        assert len(store) == len(things)
+        assert list(store) == list(store) == expected
+        assert list(store.seek(lo)) == [x for x in expected if x >= lo]
+        assert list(store.range(lo, hi)) == [x for x in expected if lo <= x < hi]
+    finally:
+        shutil.rmtree(path)
+
+
+def test_sorted_store_reopened_with_key(tmpdir):
+    """
+    Verify that a store written with a key can be reopened and queried by that key.
+    """
+    things = [(i % 10, i) for i in range(100)]
+    xsort_to_store(things, str(tmpdir), key=itemgetter(0), block_size=8)
+    store = SortedStore(str(tmpdir), key=itemgetter(0))
+    assert list(store.range(3, 5)) == [(3, i) for i in range(3, 100, 10)] + \
+        [(4, i) for i in range(4, 100, 10)]
+
+
+def test_sorted_store_reads_only_needed_blocks(tmpdir, monkeypatch):
+    """
+    Verify that a range lookup only reads the blocks which can hold the keys in the range.
+    """
+    store = xsort_to_store(range(1000), str(tmpdir), block_size=10)
+    blocks_read = []
+
+    def read_blocks(fileobj):
+        for block in _read_blocks(fileobj):
+            blocks_read.append(block)
+            yield block
+
+    _read_blocks = xsorted.store._read_blocks
+    monkeypatch.setattr(xsorted.store, '_read_blocks', read_blocks)
+    assert list(store.range(500, 520)) == list(range(500, 520))
+    assert [block[0] for block in blocks_read] == [490, 500, 510, 520]
@@ -4,10 +4,14 @@
 
 # std
 import os
+import pickle
 import random
 import threading
 import time
 import collections
+import itertools
+from functools import partial
+from operator import itemgetter
 # 3rd party
 import pygal
 from pygal.style import CleanStyle as memory_profile_chart_style
@@ -17,7 +21,11 @@ from mock import Mock
 from hypothesis import given, example, strategies as st
 from toolz.itertoolz import partition_all, sliding_window
 # local
-from xsorted import xsorter, xsorted, _split, _merge, _dump, _load
+import xsorted as xsorted_module
+from xsorted import (
+    xsorter, xsorted, _split, _merge, _dump, _load, _load_resident, _partitions, _sizeof,
+    split_replacement_selection, split_natural_runs, _Resident, _SpillCounter,
+)
 from . fixtures import xsorted_custom_serializer_fixture, benchmark_items_fixture
 from . util import random_strings
 
@@ -90,6 +98,42 @@ def test_serializer_dump_load(lists_of_things):
     assert lists_of_things == actual
 
 
+@given(things=st.lists(st.integers()), block_size=st.integers(min_value=1, max_value=10))
+def test_serializer_dump_load_block_size(things, block_size):
+    """
+    Verify that the default serializer loads as expected regardless of the block size.
+    """
+    assert list(_load(_dump(things, block_size=block_size))) == things
+
+
+class ReversingCodec(object):
+    """
+    Custom codec which reverses the bytes of each block.
+    """
+    def compress(self, data):
+        return data[::-1]
+
+    def decompress(self, data):
+        return data[::-1]
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'bz2', 'lzma', ReversingCodec()])
+def test_serializer_dump_load_codec(codec):
+    """
+    Verify that the default serializer loads as expected when compressing blocks with a codec.
+    """
+    things = list(random_strings(num=1000, length=100))
+    assert list(_load(_dump(things, codec=codec), codec=codec)) == things
+
+
+def test_xsorter_unknown_codec():
+    """
+    Verify that an unknown codec is rejected when creating the xsorted function.
+    """
+    with pytest.raises(ValueError):
+        xsorter(codec='snappy')
+
+
 def test_default_serializer_cleanup():
     """
     Verify that the default serializer cleans up after itself.
@@ -109,10 +153,112 @@ def test_split(range_size, partition_size):
 
     iterable = list(range(range_size))
 
-    list(_split(partition_size=partition_size, dump=dump, iterable=iterable))
-    expected_call_count = (range_size // partition_size) + int(bool(range_size % partition_size))
+    partition_ids = list(_split(partition_size=partition_size, dump=dump, iterable=iterable))
+    expected_partitions = (range_size // partition_size) + int(bool(range_size % partition_size))
+
+    # the last partition is kept in memory rather than being dumped.
+    assert len(partition_ids) == expected_partitions
+    assert dump.call_count == expected_partitions - 1
+    assert isinstance(partition_ids[-1], _Resident)
+
+
+@given(things=st.lists(st.integers(), max_size=10), reverse=st.booleans())
+def test_xsorted_in_memory(things, reverse):
+    """
+    Verify that an iterable which fits in a single partition is sorted without being serialized.
+    """
+    dump = Mock()
+    actual = xsorter(partition_size=10, dump=dump)(things, reverse=reverse)
+    assert list(actual) == sorted(things, reverse=reverse)
+    assert not dump.called
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_xsorted_replacement_selection(things, reverse):
+    """
+    Verify the property that xsorted == sorted when splitting using replacement selection.
+    """
+    _xsorted = xsorter(partition_size=4, split=split_replacement_selection)
+    assert_property_xsorted_is_the_same_as_sorted(_xsorted, things, reverse)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_xsorted_replacement_selection_stable(things, reverse):
+    """
+    Verify that splitting using replacement selection gives a stable sort.
+    """
+    def key(x):
+        return x // 3
 
-    assert dump.call_count == expected_call_count
+    _xsorted = xsorter(partition_size=4, split=split_replacement_selection)
+    assert list(_xsorted(things, key, reverse)) == sorted(things, key=key, reverse=reverse)
+
+
+@pytest.mark.parametrize('things, expected_runs', [
+    (range(100), 1),
+    (range(100, 0, -1), 10),
+    ([x % 20 for x in range(100)], 5),
+])
+def test_split_replacement_selection_runs(things, expected_runs):
+    """
+    Verify that replacement selection generates a single run from sorted input, and runs longer
+    than the heap size from partially sorted input.
+    """
+    partitions = split_replacement_selection(list, 10, things)
+    assert len(partitions) == expected_runs
+    assert sorted(x for partition in partitions for x in partition) == sorted(things)
+    assert all(partition == sorted(partition) for partition in partitions)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_xsorted_natural_runs(things, reverse):
+    """
+    Verify the property that xsorted == sorted when splitting into natural runs.
+    """
+    _xsorted = xsorter(partition_size=4, split=split_natural_runs)
+    assert_property_xsorted_is_the_same_as_sorted(_xsorted, things, reverse)
+    assert list(_xsorted(iter(things), reverse=reverse)) == sorted(things, reverse=reverse)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_xsorted_natural_runs_stable(things, reverse):
+    """
+    Verify that splitting into natural runs gives a stable sort.
+    """
+    def key(x):
+        return x // 3
+
+    _xsorted = xsorter(partition_size=4, split=split_natural_runs)
+    assert list(_xsorted(iter(things), key, reverse)) == sorted(things, key=key, reverse=reverse)
+
+
+def test_split_natural_runs_sorted_sequence():
+    """
+    Verify that a sequence which is already sorted is not serialized.
+    """
+    dump = Mock()
+    partition_ids = split_natural_runs(dump, 10, list(range(100)))
+    assert not dump.called
+    assert len(partition_ids) == 1 and isinstance(partition_ids[0], _Resident)
+
+
+@pytest.mark.parametrize('things, expected_runs', [
+    (range(100), 1),
+    (range(100, 0, -1), 1),
+    (list(range(50)) + list(range(50)), 2),
+    (list(range(50, 0, -1)) + list(range(100, 50, -1)), 2),
+    ([0, 2, 1, 3] * 5, 2),
+])
+def test_split_natural_runs(things, expected_runs):
+    """
+    Verify that sorted stretches of the input and stretches in the opposite order are each
+    serialized as a single run.
+    """
+    partition_ids = split_natural_runs(list, 10, iter(things))
+    assert len(partition_ids) == expected_runs
+    partitions = [list(_load_resident(iter, partition_id)) for partition_id in partition_ids]
+    assert sorted(x for partition in partitions for x in partition) == sorted(things)
+    assert all(partition == sorted(partition) for partition in partitions)
 
 
 @given(
@@ -131,9 +277,566 @@ def test_merge(partition_size, num_items):
     assert list(merged) == list(items)
 
 
+@given(
+    things=st.lists(st.one_of(st.integers(), st.text(), st.lists(st.integers()))),
+    memory_limit=st.integers(min_value=1, max_value=4096),
+)
+def test_partitions_by_memory(things, memory_limit):
+    """
+    Verify that _partitions keeps every partition within memory_limit, unless a single item is
+    larger than the limit, without losing or reordering any items.
+    """
+    partitions = [partition for partition, _ in _partitions(None, things, memory_limit)]
+    assert [x for partition in partitions for x in partition] == things
+    for partition in partitions:
+        used = sum(_sizeof(x) for x in partition)
+        assert len(partition) == 1 or used <= memory_limit
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_xsorted_memory_limit(things, reverse):
+    """
+    Verify the property that xsorted == sorted when partitions are sized by memory.
+    """
+    assert_property_xsorted_is_the_same_as_sorted(xsorter(memory_limit=256), things, reverse)
+
+
+@given(
+    partition_size=st.integers(min_value=1, max_value=10),
+    max_fan_in=st.integers(min_value=2, max_value=5),
+    num_items=st.integers(min_value=0, max_value=100),
+)
+def test_merge_max_fan_in(partition_size, max_fan_in, num_items):
+    """
+    Verify that _merge merges in multiple passes when there are more than max_fan_in partitions,
+    consuming every partition and reporting the number of passes.
+    """
+    partitions = {}
+    ids = itertools.count()
+
+    def dump(partition):
+        partition_id = next(ids)
+        partitions[partition_id] = list(partition)
+        return partition_id
+
+    def load(partition_id):
+        return iter(partitions.pop(partition_id))
+
+    partition_ids = [dump(x) for x in partition_all(partition_size, range(num_items))]
+    stats = collections.Counter()
+    merged = _merge(load, partition_ids, dump=dump, max_fan_in=max_fan_in, stats=stats)
+    assert list(merged) == list(range(num_items))
+    assert not partitions
+    assert max_fan_in ** stats['merge_passes'] >= len(partition_ids)
+
+
+def test_merge_max_fan_in_invalid():
+    """
+    Verify that a max_fan_in which cannot make progress is rejected.
+    """
+    with pytest.raises(ValueError):
+        _merge(_load, [], dump=_dump, max_fan_in=1)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_xsorted_max_fan_in(things, reverse):
+    """
+    Verify the property that xsorted == sorted when merging in multiple passes.
+    """
+    _xsorted = xsorter(partition_size=2, max_fan_in=2)
+    assert_property_xsorted_is_the_same_as_sorted(_xsorted, things, reverse)
+
+
+@pytest.mark.parametrize('key', [None, abs])
+def test_xsorted_workers(key):
+    """
+    Verify that sorting partitions in worker processes gives the same, stable, result as sorted.
+    """
+    random.seed(0)
+    things = [random.randint(-100, 100) for _ in range(5000)]
+    actual = list(xsorter(partition_size=100, workers=2)(things, key=key))
+    assert actual == sorted(things, key=key)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_xsorted_background(things, reverse):
+    """
+    Verify the property that xsorted == sorted when partitions are written in the background.
+    """
+    _xsorted = xsorter(partition_size=4, background=True)
+    assert_property_xsorted_is_the_same_as_sorted(_xsorted, things, reverse)
+
+
+def test_split_background_bounded():
+    """
+    Verify that the background writer holds at most two partitions in memory, the one being
+    written and the one being filled, plus the first item of the partition which follows.
+    """
+    partition_size = 10
+    counts = collections.Counter()
+
+    def things():
+        for x in range(100):
+            counts['read'] += 1
+            assert counts['read'] - counts['written'] <= 2 * partition_size + 1
+            yield x
+
+    def dump(partition):
+        time.sleep(0.001)
+        counts['written'] += len(partition)
+
+    partition_ids = _split(dump, partition_size, things(), background=True, keep_last=False)
+    assert len(partition_ids) == 10
+    assert counts['written'] == 100
+
+
+@given(
+    partition_size=st.integers(min_value=1, max_value=10),
+    read_ahead=st.integers(min_value=1, max_value=10),
+    num_items=st.integers(min_value=0, max_value=100),
+)
+def test_merge_read_ahead(partition_size, read_ahead, num_items):
+    """
+    Verify that _merge reading ahead from each partition in the background merges correctly.
+    """
+    items = range(num_items)
+    partitions = list(partition_all(partition_size, items))
+    merged = _merge(lambda x: partitions[x], range(len(partitions)), read_ahead=read_ahead)
+    assert list(merged) == list(items)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_properties_xsorted_read_ahead(things, reverse):
+    """
+    Verify the property that xsorted == sorted when reading ahead while merging.
+    """
+    _xsorted = xsorter(partition_size=4, max_fan_in=2, read_ahead=3)
+    assert_property_xsorted_is_the_same_as_sorted(_xsorted, things, reverse)
+
+
+@given(things=st.lists(st.integers()), reverse=st.booleans())
+def test_xsorted_store_keys(things, reverse):
+    """
+    Verify that when keys are stored the key is called once per item and the result is the same,
+    stable, order as sorted.
+    """
+    key = Mock(side_effect=lambda x: x // 3)
+    actual = list(xsorter(partition_size=4, store_keys=True)(things, key=key, reverse=reverse))
+    assert actual == sorted(things, key=lambda x: x // 3, reverse=reverse)
+    assert key.call_count == len(things)
+
+
+@given(
+    things=st.lists(st.integers()),
+    reverse=st.booleans(),
+    limit=st.integers(min_value=0, max_value=20),
+)
+def test_xsorted_limit(things, reverse, limit):
+    """
+    Verify that xsorted with a limit gives the first limit items of a stable sort, both when
+    selecting in memory and when the limit is larger than a partition.
+    """
+    def key(x):
+        return x // 3
+
+    expected = sorted(things, key=key, reverse=reverse)[:limit]
+    assert list(xsorted(things, key=key, reverse=reverse, limit=limit)) == expected
+    assert list(xsorter(partition_size=4, limit=limit)(things, key, reverse)) == expected
+
+
+def test_xsorted_limit_in_memory():
+    """
+    Verify that nothing is serialized when the limit fits in a partition.
+    """
+    dump = Mock()
+    actual = list(xsorter(partition_size=10, dump=dump, limit=10)(range(1000, 0, -1)))
+    assert actual == list(range(1, 11))
+    assert not dump.called
+
+
+def test_xsorted_limit_memory_limit():
+    """
+    Verify that the limit is not selected in memory when partitions are sized by memory_limit,
+    since limit items may not fit in the memory budget.
+    """
+    things = [str(i) * 1000 for i in range(100)]
+    dump = Mock(side_effect=_dump)
+    actual = list(xsorter(memory_limit=1 << 14, dump=dump, limit=50)(reversed(things)))
+    assert actual == sorted(things)[:50]
+    assert dump.called
+
+
+def test_split_limit_drops_items():
+    """
+    Verify that items which cannot be among the first limit items are not serialized.
+    """
+    dumped = []
+    _split(dumped.extend, 10, range(1000), limit=15, keep_last=False)
+    # two partitions are needed to hold limit items, plus the item which is read ahead.
+    assert len(dumped) <= 2 * 10 + 1
+
+
+@pytest.mark.parametrize('split', [split_natural_runs, split_replacement_selection])
+def test_xsorted_limit_other_splitters(split):
+    """
+    Verify that a limit larger than a partition can be used with splitters which do not accept a
+    limit, in which case the merged items are truncated.
+    """
+    things = random.sample(range(100), 100)
+    actual = xsorter(partition_size=10, split=split, limit=25)(things)
+    assert list(actual) == list(range(25))
+
+
+def test_split_limit_sorts_once():
+    """
+    Verify that partitions which have been sorted by the limit are not sorted again, so the key of
+    each item is only computed by the limit filter, the limit sort and the bound of the limit.
+    """
+    calls = collections.Counter()
+
+    def key(x):
+        calls[x] += 1
+        return x
+
+    _split(Mock(), 10, random.sample(range(100), 100), key=key, limit=15)
+    assert max(calls.values()) <= 3
+
+
+def _expected_unique(things, key, reverse):
+    """
+    The first of each group of things with the same key, and the size of the group, in sorted
+    order.
+    """
+    grouped = itertools.groupby(sorted(things, key=key, reverse=reverse), key)
+    return [(next(group), 1 + sum(1 for _ in group)) for _, group in grouped]
+
+
+@given(
+    things=st.lists(st.integers(min_value=0, max_value=30)),
+    reverse=st.booleans(),
+    store_keys=st.booleans(),
+    max_fan_in=st.one_of(st.none(), st.integers(min_value=2, max_value=3)),
+)
+def test_xsorted_unique(things, reverse, store_keys, max_fan_in):
+    """
+    Verify that unique keeps the first item of each key and that counts counts the items with each
+    key.
+    """
+    def key(x):
+        return x // 3
+
+    expected = _expected_unique(things, key, reverse)
+    _xsorted = partial(xsorter, partition_size=4, store_keys=store_keys, max_fan_in=max_fan_in)
+    assert list(_xsorted(unique=True)(things, key, reverse)) == [x for x, _ in expected]
+    assert list(_xsorted(counts=True)(things, key, reverse)) == expected
+    limited = _xsorted(unique=True, limit=5)(things, key, reverse)
+    assert list(limited) == [x for x, _ in expected][:5]
+
+
+def test_xsorted_unique_dumps_distinct_items():
+    """
+    Verify that duplicates are removed from each partition before it is serialized.
+    """
+    dumped = []
+
+    def dump(partition):
+        dumped.append(list(partition))
+        return len(dumped) - 1
+
+    _xsorted = xsorter(partition_size=100, dump=dump, load=lambda x: iter(dumped[x]), unique=True)
+    assert list(_xsorted([x % 10 for x in range(1000)])) == list(range(10))
+    assert all(partition == list(range(10)) for partition in dumped)
+
+
+def _add_values(first, second):
+    """
+    Combiner of (key, value) pairs which adds the values.
+    """
+    return first[0], first[1] + second[1]
+
+
+@given(
+    things=st.lists(st.tuples(st.integers(min_value=0, max_value=10), st.integers())),
+    reverse=st.booleans(),
+    store_keys=st.booleans(),
+    max_fan_in=st.one_of(st.none(), st.integers(min_value=2, max_value=3)),
+)
+def test_xsorted_combine(things, reverse, store_keys, max_fan_in):
+    """
+    Verify that combine returns one aggregated item for each key, the same as grouping the sorted
+    items and reducing each group.
+    """
+    key = itemgetter(0)
+    expected = [(k, sum(v for _, v in group))
+                for k, group in itertools.groupby(sorted(things, key=key, reverse=reverse), key)]
+    _xsorted = xsorter(partition_size=4, store_keys=store_keys, max_fan_in=max_fan_in,
+                       combine=_add_values)
+    assert list(_xsorted(things, key, reverse)) == expected
+
+
+def test_xsorted_combine_with_workers():
+    """
+    Verify that combine is applied when partitions are dumped by worker processes.
+    """
+    things = [(x % 7, 1) for x in range(1000)]
+    actual = xsorted(things, key=itemgetter(0), workers=2, combine=_add_values)
+    assert list(actual) == [(k, len(range(k, 1000, 7))) for k in range(7)]
+
+
+def test_xsorted_combine_exclusive():
+    """
+    Verify that only one of unique, counts and combine can be set.
+    """
+    with pytest.raises(ValueError):
+        xsorted([1, 2], unique=True, combine=max)
+
+
+def test_xsorted_stats():
+    """
+    Verify that stats records the partitions which were serialized, the merge passes and the time
+    of each phase.
+    """
+    stats = collections.Counter()
+    things = random.sample(range(1000), 1000)
+    _xsorted = xsorter(partition_size=100, max_fan_in=4, stats=stats)
+    assert list(_xsorted(things)) == sorted(things)
+    # 9 partitions are serialized by split, the last is kept in memory.
+    assert stats['runs'] == 9
+    assert stats['items_spilled'] == 900 and stats['items_resident'] == 100
+    assert stats['max_run_items'] == 100
+    assert 0 < stats['max_run_bytes'] <= stats['bytes_spilled']
+    assert stats['merge_passes'] == 2 and stats['max_merge_fan_in'] == 4
+    for phase in ('split', 'sort', 'dump', 'serialize', 'write', 'merge', 'read', 'deserialize'):
+        assert stats[phase + '_wall'] > 0 and stats[phase + '_cpu'] >= 0
+
+
+def test_xsorted_stats_custom_splitter():
+    """
+    Verify that stats can be used with a custom splitter which does not accept it, in which case
+    the partitions which were serialized are not recorded.
+    """
+    def split(dump, partition_size, iterable, key=None, reverse=False):
+        return _split(dump, partition_size, iterable, key=key, reverse=reverse)
+
+    stats = collections.Counter()
+    things = random.sample(range(1000), 1000)
+    _xsorted = xsorter(partition_size=100, split=split, max_fan_in=4, stats=stats)
+    assert list(_xsorted(things)) == sorted(things)
+    assert stats['runs'] == 0 and stats['merge_passes'] == 2
+
+
+def test_xsorter_inspects_once(monkeypatch):
+    """
+    Verify that the signatures of the dependencies are only inspected when stats is set, and only
+    once for each dependency, since xsorted creates a new xsorter for every sort.
+    """
+    def split(dump, partition_size, iterable, key=None, reverse=False, stats=None):
+        return _split(dump, partition_size, iterable, key=key, reverse=reverse, stats=stats)
+
+    inspect_accepts = Mock(side_effect=xsorted_module._inspect_accepts)
+    monkeypatch.setattr(xsorted_module, '_inspect_accepts', inspect_accepts)
+    xsorter(split=split)
+    assert not inspect_accepts.called
+    stats = collections.Counter()
+    xsorter(split=split, stats=stats)
+    assert inspect_accepts.call_args_list.count(((split, 'stats'), {})) == 1
+    xsorter(split=split, stats=stats)
+    assert inspect_accepts.call_args_list.count(((split, 'stats'), {})) == 1
+
+
+def test_xsorted_spill_dirs_round_robin(tmpdir):
+    """
+    Verify that partitions are spread evenly over spill_dirs.
+    """
+    spill_dirs = [str(tmpdir.mkdir(name)) for name in 'abc']
+    dump = Mock(side_effect=_dump)
+    things = random.sample(range(1000), 1000)
+    _xsorted = xsorter(partition_size=100, dump=dump, spill_dirs=spill_dirs)
+    assert list(_xsorted(things)) == sorted(things)
+    dirs = collections.Counter(call[1]['dir'] for call in dump.call_args_list)
+    assert sorted(dirs) == spill_dirs and sorted(dirs.values()) == [3, 3, 3]
+
+
+def test_xsorted_spill_dirs_per_sorter(tmpdir):
+    """
+    Verify that each sorter starts with the first of spill_dirs, regardless of the partitions
+    which other sorters have dumped.
+    """
+    spill_dirs = [str(tmpdir.mkdir(name)) for name in 'abc']
+    for _ in range(2):
+        dump = Mock(side_effect=_dump)
+        _xsorted = xsorter(partition_size=10, dump=dump, spill_dirs=spill_dirs)
+        assert list(_xsorted(range(30, 0, -1))) == list(range(1, 31))
+        assert [call[1]['dir'] for call in dump.call_args_list] == spill_dirs[:2]
+
+
+def test_spill_counter_copies():
+    """
+    Verify that each copy of a spill counter sent to a worker process is taken from the next count,
+    so that the partitions of the workers are spread over the spill dirs.
+    """
+    counter = _SpillCounter()
+    copies = [pickle.loads(pickle.dumps(counter)) for _ in range(3)]
+    assert [next(copy) for copy in copies] == [0, 1, 2]
+    assert next(counter) == 3
+
+
+def test_xsorted_spill_dirs_free_space(tmpdir, monkeypatch):
+    """
+    Verify that partitions are written to the spill dir with the most free space.
+    """
+    spill_dirs = [str(tmpdir.mkdir(name)) for name in 'abc']
+    monkeypatch.setattr(xsorted_module, '_free_space',
+                        lambda path: {'a': 1, 'b': 3, 'c': 2}[os.path.basename(path)])
+    dump = Mock(side_effect=_dump)
+    _xsorted = xsorter(partition_size=10, dump=dump, spill_dirs=spill_dirs,
+                       spill_policy='free_space')
+    assert list(_xsorted(range(100, 0, -1))) == list(range(1, 101))
+    assert set(call[1]['dir'] for call in dump.call_args_list) == set([spill_dirs[1]])
+
+
+def test_xsorted_spill_dirs_with_workers(tmpdir):
+    """
+    Verify that partitions can be written to spill_dirs by worker processes.
+    """
+    spill_dirs = [str(tmpdir.mkdir(name)) for name in 'ab']
+    things = random.sample(range(1000), 1000)
+    _xsorted = xsorter(partition_size=100, workers=2, spill_dirs=spill_dirs, read_ahead=10)
+    assert list(_xsorted(things)) == sorted(things)
+    assert all(not os.listdir(spill_dir) for spill_dir in spill_dirs)
+
+
+class Interrupted(Exception):
+    """
+    Raised to simulate a sort which is interrupted.
+    """
+
+
+class InterruptingDump(object):
+    """
+    Dump which counts it's calls and raises ``Interrupted`` when it is called for the
+    interrupt_at'th time. The same dump can be used to resume the sort, since a sort can only be
+    resumed with the same options.
+    """
+    def __init__(self, interrupt_at=None):
+        self.interrupt_at = interrupt_at
+        self.calls = 0
+
+    def __call__(self, partition, **kwargs):
+        self.calls += 1
+        if self.calls == self.interrupt_at:
+            raise Interrupted()
+        return _dump(partition, **kwargs)
+
+
+def test_xsorted_work_dir_removed_after_sort(tmpdir):
+    """
+    Verify that a sort using a work directory is the same as sorted and leaves nothing behind.
+    """
+    things = random.sample(range(1000), 1000)
+    _xsorted = xsorter(partition_size=64, max_fan_in=4, work_dir=str(tmpdir))
+    assert list(_xsorted(things)) == sorted(things)
+    assert tmpdir.listdir() == []
+
+
+@pytest.mark.parametrize('interrupted_at, dumps_resumed', [(3, 8 + 4 + 2), (15, 2)])
+def test_xsorted_work_dir_resumes(tmpdir, interrupted_at, dumps_resumed):
+    """
+    Verify that a sort which is interrupted is resumed without serializing the recorded
+    partitions again. The 10 partitions are merged in two intermediate passes of 4 and 2
+    partitions, so the 3rd dump is while splitting and the 15th is in the second pass.
+    """
+    things = random.sample(range(1000), 1000)
+    dump = InterruptingDump(interrupted_at)
+    _xsorted = xsorter(partition_size=100, max_fan_in=3, dump=dump, work_dir=str(tmpdir))
+    with pytest.raises(Interrupted):
+        _xsorted(things)
+    dump.interrupt_at, dump.calls = None, 0
+    assert list(_xsorted(things)) == sorted(things)
+    assert dump.calls == dumps_resumed
+    assert tmpdir.listdir() == []
+
+
+def test_xsorted_work_dir_resumes_after_partial_journal_entry(tmpdir):
+    """
+    Verify that a run which was only partly recorded in the journal is sorted again.
+    """
+    things = random.sample(range(1000), 1000)
+    dump = InterruptingDump(4)
+    _xsorted = xsorter(partition_size=100, dump=dump, work_dir=str(tmpdir))
+    with pytest.raises(Interrupted):
+        _xsorted(things)
+    journal = tmpdir.join('journal')
+    journal.write(journal.read()[:-3])
+    dump.interrupt_at, dump.calls = None, 0
+    assert list(_xsorted(things)) == sorted(things)
+    assert dump.calls == 10 - 2
+    assert tmpdir.listdir() == []
+
+
+def test_xsorted_work_dir_not_empty(tmpdir):
+    """
+    Verify that a sort does not start in a directory which holds other files, and leaves them.
+    """
+    tmpdir.join('important.txt').write('keep me')
+    with pytest.raises(ValueError):
+        xsorter(work_dir=str(tmpdir))([3, 2, 1])
+    assert tmpdir.join('important.txt').read() == 'keep me'
+
+
+def test_xsorted_work_dir_different_sort(tmpdir):
+    """
+    Verify that a sort which was stopped before it's output was read to the end is not resumed
+    by a sort of different input or with different options.
+    """
+    _xsorted = xsorter(partition_size=2, work_dir=str(tmpdir))
+    assert next(iter(_xsorted([5, 4, 3, 2, 1]))) == 1
+    with pytest.raises(ValueError):
+        _xsorted([100, 99])
+    with pytest.raises(ValueError):
+        _xsorted([5, 4, 3, 2, 1], reverse=True)
+    assert list(_xsorted([5, 4, 3, 2, 1])) == [1, 2, 3, 4, 5]
+    assert tmpdir.listdir() == []
+
+
+def test_xsorted_work_dir_different_stored_key(tmpdir):
+    """
+    Verify that a sort which stores keys is not resumed by a sort with a different key, even if
+    the key of the first item is the same.
+    """
+    things = [1] + random.sample(range(-500, 0), 500)
+    dump = InterruptingDump(3)
+    _xsorted = xsorter(partition_size=100, dump=dump, store_keys=True, work_dir=str(tmpdir))
+    with pytest.raises(Interrupted):
+        _xsorted(things, key=abs)
+    dump.interrupt_at = None
+    with pytest.raises(ValueError):
+        _xsorted(things, key=int)
+    assert list(_xsorted(things, key=abs)) == sorted(things, key=abs)
+
+
+def test_xsorted_work_dir_lambda_key(tmpdir):
+    """
+    Verify that a key which can not be told apart from other keys by it's name is refused.
+    """
+    with pytest.raises(ValueError):
+        xsorter(work_dir=str(tmpdir))([3, 2, 1], key=lambda x: x)
+
+
+def test_xsorted_work_dir_leftover_runs(tmpdir):
+    """
+    Verify that the runs left over by a sort which completed but was stopped before they were
+    removed do not prevent the next sort.
+    """
+    tmpdir.mkdir('runs').join('0').write('')
+    assert list(xsorter(work_dir=str(tmpdir))([3, 2, 1])) == [1, 2, 3]
+    assert tmpdir.listdir() == []
+
+
 def do_benchmark(items, function_to_test, benchmark=None):
     """
-    Generic benchmarking function that will iterate through the ``items`` sorted using ``function_under_test``.
+    Generic benchmarking function that will iterate through the ``items`` sorted using
+    ``function_under_test``.
 
     :param items: The items to sort.
     :param function_to_test: The sort function to use.
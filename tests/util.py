@@ -7,4 +7,44 @@ from six.moves import xrange
 
 def random_strings(num, length, seed=0):
     random.seed(seed)
-    return (''.join([random.choice(string.printable)] * length) for _ in xrange(num))
\ No newline at end of file
+    return (''.join([random.choice(string.printable)] * length) for _ in xrange(num))
+
+
+def _random_word(rng, length=8):
+    return ''.join(rng.choice(string.ascii_letters) for _ in xrange(length))
+
+
+# makes a random item of each kind of data which is benchmarked.
+_RANDOM_ITEM = {
+    'ints': lambda rng: rng.randint(0, 1 << 31),
+    'floats': lambda rng: rng.random(),
+    'strings': _random_word,
+    'tuples': lambda rng: (rng.randint(0, 1 << 31), _random_word(rng)),
+    'dicts': lambda rng: {'id': rng.randint(0, 1 << 31), 'name': _random_word(rng)},
+}
+
+
+def random_items(kind, num, seed=0):
+    """
+    Generate num random items of a kind of data, one of ``'ints'``, ``'floats'``, ``'strings'``,
+    ``'tuples'`` or ``'dicts'``.
+    """
+    rng = random.Random(seed)
+    random_item = _RANDOM_ITEM[kind]
+    return (random_item(rng) for _ in xrange(num))
+
+
+def presorted(items, order, key=None, seed=0):
+    """
+    Arrange a list of items in an order which is ``'random'`` (unchanged), ``'sorted'``,
+    ``'reversed'`` or ``'nearly'`` sorted, where 1% of the items are swapped with a random item.
+    """
+    if order == 'random':
+        return items
+    items = sorted(items, key=key, reverse=order == 'reversed')
+    if order == 'nearly':
+        rng = random.Random(seed)
+        for _ in xrange(len(items) // 100):
+            i, j = rng.randrange(len(items)), rng.randrange(len(items))
+            items[i], items[j] = items[j], items[i]
+    return items
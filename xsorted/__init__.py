@@ -11,65 +11,832 @@ except:                         # pragma: no cover
 import os
 import sys
 import pickle
+import struct
+import shutil
 import tempfile
-from functools import partial
+import time
+import heapq
+import json
+import hashlib
+import operator
+import importlib
+import inspect
+import weakref
+import itertools
+import collections
+from functools import partial, reduce
+from itertools import islice
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 # compat
-from contextlib2 import suppress, contextmanager
+from contextlib2 import contextmanager
+try:
+    from collections.abc import Sequence
+except ImportError:             # pragma: no cover
+    from collections import Sequence
 if sys.version_info[:2] >= (3, 5):
     from heapq import merge
 else:
     from xsorted.backports_heapq_merge import merge
 # 3rd party
 from toolz.functoolz import compose
-from toolz.itertoolz import partition_all
+from toolz.itertoolz import partition_all, sliding_window
 
 
 __author__ = __copyright__ = "Daniel Bradburn"
 __license__ = "MIT"
 
 
-def _dump(partition):
+# size of the reference held by a partition list for each item.
+_POINTER_SIZE = struct.calcsize('P')
+# default number of items pickled together in each block of a partition file.
+_BLOCK_SIZE = 128
+# length prefix of each block of a partition file.
+_BLOCK_HEADER = struct.Struct('<Q')
+# number of threads used for reading ahead when merging partitions.
+_READ_AHEAD_THREADS = 8
+# names of the standard library modules which can be used as codecs.
+_CODECS = frozenset(['zlib', 'bz2', 'lzma'])
+# name of the manifest file of a checkpointed sort.
+_MANIFEST = 'manifest.json'
+# name of the journal of the runs of a checkpointed sort which is being split.
+_JOURNAL = 'journal'
+# name of the subdirectory of the work directory which runs are serialized to.
+_RUNS = 'runs'
+# replaces a file atomically, os.rename on python 2 where os.replace does not exist.
+_replace = getattr(os, 'replace', os.rename)
+# clocks used for timing the phases of a sort, falling back to the clocks of python 2.
+_wall_time = getattr(time, 'perf_counter', time.time)
+_cpu_time = getattr(time, 'process_time', None) or time.clock
+# number of merged items which are timed together.
+_TIMED_BATCH_SIZE = 1024
+# the ways in which a directory is chosen from spill_dirs for each partition.
+_SPILL_POLICIES = frozenset(['round_robin', 'free_space'])
+# key of the (key, item) pairs which are serialized when keys are stored.
+_stored_key = itemgetter(0)
+
+
+def _bind(func, **options):
+    """
+    Pre-bind the keyword arguments of func which have been set, options which are ``None`` are
+    left out so that custom implementations only need to accept the options they make use of.
+
+    :param func:    The callable to bind options to.
+
+    :param options: The keyword arguments to bind.
+
+    :return: func with the options that are not ``None`` bound.
+    """
+    options = dict((k, v) for k, v in options.items() if v is not None)
+    return partial(func, **options) if options else func
+
+
+# results of _accepts for each callable, since xsorted creates a new xsorter for every sort.
+_accepts_cache = weakref.WeakKeyDictionary()
+
+
+def _accepts(func, name):
+    """
+    Check whether func can be called with a keyword argument, so that options are only passed to
+    custom implementations which support them. The result is cached for callables which can be
+    weakly referenced.
+
+    :param func: The callable to check, which may be a ``functools.partial``.
+
+    :param name: The name of the keyword argument.
+
+    :return: ``True`` if func has a parameter called name or accepts any keyword arguments.
+    """
+    while isinstance(func, partial):
+        func = func.func
+    try:
+        return _accepts_cache[func][name]
+    except (KeyError, TypeError):
+        pass
+    accepts = _inspect_accepts(func, name)
+    try:
+        _accepts_cache.setdefault(func, {})[name] = accepts
+    except TypeError:
+        pass
+    return accepts
+
+
+def _inspect_accepts(func, name):
+    """
+    Implementation of ``_accepts`` for a callable which is not a ``functools.partial``.
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except AttributeError:  # python 2
+        spec = inspect.getargspec(func)
+        return spec.keywords is not None or name in spec.args
+    except (TypeError, ValueError):
+        return True
+    return any(parameter.name == name or parameter.kind == parameter.VAR_KEYWORD
+               for parameter in parameters)
+
+
+@contextmanager
+def _timed(stats, phase):
+    """
+    Add the wall and the cpu time spent in the body of the with statement to the
+    ``<phase>_wall`` and ``<phase>_cpu`` statistics, in seconds.
+
+    :param stats: The ``collections.Counter`` to update, nothing is timed if ``None``.
+
+    :param phase: The name of the phase being timed.
+    """
+    if stats is None:
+        yield
+        return
+    wall, cpu = _wall_time(), _cpu_time()
+    try:
+        yield
+    finally:
+        stats[phase + '_wall'] += _wall_time() - wall
+        stats[phase + '_cpu'] += _cpu_time() - cpu
+
+
+def _timed_iter(stats, phase, iterable, batch_size=_TIMED_BATCH_SIZE):
+    """
+    Time getting the items of a lazy iterable, but not the time spent by the caller between items.
+    Items are taken batch_size at a time so that the clocks are not read for every item.
+
+    :return: iterable of the items of iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        with _timed(stats, phase):
+            batch = _take(batch_size, iterator)
+        if not batch:
+            return
+        for item in batch:
+            yield item
+
+
+def _spilled_bytes(partition_id):
+    """
+    Get the size of a serialized partition.
+
+    :return: The size of the file partition_id if it is the path of a file, or of the files of
+             each piece of a ``_Chained`` partition, otherwise 0.
+    """
+    if isinstance(partition_id, _Chained):
+        return sum(map(_spilled_bytes, partition_id.partition_ids))
+    try:
+        return os.path.getsize(partition_id)
+    except (TypeError, OSError):
+        return 0
+
+
+def _record_run(stats, partition_id, size=None):
+    """
+    Update stats with a partition which has been serialized.
+
+    :param stats:        The ``collections.Counter`` to update, if not ``None``.
+
+    :param partition_id: The id returned by dump.
+
+    :param size:         If known, the number of items in the partition.
+    """
+    if stats is None:
+        return
+    stats['runs'] += 1
+    run_bytes = _spilled_bytes(partition_id)
+    stats['bytes_spilled'] += run_bytes
+    stats['max_run_bytes'] = max(stats['max_run_bytes'], run_bytes)
+    if size is not None:
+        stats['items_spilled'] += size
+        stats['max_run_items'] = max(stats['max_run_items'], size)
+
+
+def _codec(codec):
+    """
+    Get the codec used for compressing the blocks of a partition file.
+
+    :param codec: Either the name of one of the compression modules in the standard library
+                  (``'zlib'``, ``'bz2'`` or ``'lzma'``), or an object with ``compress`` and
+                  ``decompress`` methods which take and return bytes.
+
+    :return: object with ``compress`` and ``decompress`` methods.
+    """
+    if codec in _CODECS:
+        return importlib.import_module(codec)
+    if not (hasattr(codec, 'compress') and hasattr(codec, 'decompress')):
+        raise ValueError('codec should be one of {0} or have compress and decompress methods, got '
+                         '{1!r}'.format(', '.join(sorted(_CODECS)), codec))
+    return codec
+
+
+def _dump(partition, block_size=_BLOCK_SIZE, codec=None, dir=None, stats=None):
     """
     Dump the given partition to an external source.
 
-    The default implementation is to pickle the list of objects to a temporary file.
+    The default implementation is to pickle the list of objects to a temporary file. Items are
+    pickled in blocks of block_size items using the highest pickle protocol, each block is
+    prefixed with it's length so that it can be read back in a single read.
+
+    :param partition:  The partition of objects to dump.
+
+    :param block_size: The number of items to pickle in each block.
 
-    :param partition: The partition of objects to dump.
+    :param codec:      If set, the codec used to compress each block, see ``_codec``.
+
+    :param dir:        If set, the directory to create the temporary file in.
+
+    :param stats:      If set, a ``collections.Counter`` which is updated with the time spent
+                       serializing and writing blocks, see ``_write_blocks``.
 
     :return: Unique id which can be used to reload the serialized partition. In the case of the
              default implementation this is the path to the temporary file.
     """
-    with tempfile.NamedTemporaryFile(delete=False) as fileobj:
-        for item in partition:
-            pickle.dump(item, fileobj)
+    with tempfile.NamedTemporaryFile(dir=dir, delete=False) as fileobj:
+        _write_blocks(fileobj, partition, block_size, codec, stats)
         return fileobj.name
 
 
-def _load(partition_id):
+def _free_space(path):
+    """
+    Get the number of bytes available to the user on the file system containing path.
+    """
+    if hasattr(os, 'statvfs'):
+        stat = os.statvfs(path)
+        return stat.f_bavail * stat.f_frsize
+    return shutil.disk_usage(path).free
+
+
+class _SpillCounter(object):
+    """
+    Counts the partitions which a sorter has dumped to spill_dirs, for choosing them round robin.
+
+    A partition sorted by a worker process is sent with a copy of the counter, so each copy is
+    taken from the next count, which spreads the partitions over the directories in the order in
+    which they are submitted.
+    """
+    __slots__ = ('count',)
+
+    def __init__(self, count=0):
+        self.count = count
+
+    def __next__(self):
+        count, self.count = self.count, self.count + 1
+        return count
+
+    next = __next__  # python 2
+
+    def __reduce__(self):
+        return _SpillCounter, (next(self),)
+
+
+def _spill_dir(spill_dirs, policy, counter):
+    """
+    Choose the directory to serialize the next partition to.
+
+    :param spill_dirs: List of directories, typically on different disks.
+
+    :param policy:     ``'round_robin'`` to use each directory in turn, or ``'free_space'`` to use
+                       the directory with the most free space.
+
+    :param counter:    The ``_SpillCounter`` of the sorter, used by ``'round_robin'``.
+
+    :return: One of spill_dirs.
+    """
+    if policy == 'free_space':
+        return max(spill_dirs, key=_free_space)
+    return spill_dirs[next(counter) % len(spill_dirs)]
+
+
+def _dump_striped(spill_dirs, policy, counter, dump, partition):
+    """
+    Serialize partition using dump to one of spill_dirs, see ``_spill_dir``. This is a module level
+    function so that it can be sent to worker processes.
+
+    :return: The id returned by dump.
+    """
+    return dump(partition, dir=_spill_dir(spill_dirs, policy, counter))
+
+
+def _write_blocks(fileobj, items, block_size=_BLOCK_SIZE, codec=None, stats=None):
+    """
+    Write items to fileobj in the block format read by ``_read_blocks``.
+
+    :param fileobj:    File object opened for writing in binary mode.
+
+    :param items:      Iterable of the items to write.
+
+    :param block_size: The number of items to pickle in each block.
+
+    :param codec:      If set, the codec used to compress each block, see ``_codec``.
+
+    :param stats:      If set, a ``collections.Counter`` which is updated with the wall and cpu
+                       time of pickling and compressing blocks as the ``serialize`` phase, and of
+                       writing them as the ``write`` phase.
+    """
+    compress = None if codec is None else _codec(codec).compress
+    for block in _partition(block_size, items):
+        with _timed(stats, 'serialize'):
+            data = pickle.dumps(block, pickle.HIGHEST_PROTOCOL)
+            if compress is not None:
+                data = compress(data)
+        with _timed(stats, 'write'):
+            fileobj.write(_BLOCK_HEADER.pack(len(data)))
+            fileobj.write(data)
+
+
+def _read_blocks(fileobj, codec=None, stats=None):
+    """
+    Read the blocks of items written by ``_dump`` from fileobj.
+
+    :param fileobj: File object opened for reading in binary mode.
+
+    :param codec:   If set, the codec which was used to compress each block, see ``_codec``.
+
+    :param stats:   If set, a ``collections.Counter`` which is updated with the wall and cpu time
+                    of reading blocks as the ``read`` phase, and of decompressing and unpickling
+                    them as the ``deserialize`` phase.
+
+    :return: iterable of the blocks of items in fileobj.
+    """
+    decompress = None if codec is None else _codec(codec).decompress
+    while True:
+        with _timed(stats, 'read'):
+            header = fileobj.read(_BLOCK_HEADER.size)
+            data = fileobj.read(_BLOCK_HEADER.unpack(header)[0]) if header else None
+        if data is None:
+            return
+        with _timed(stats, 'deserialize'):
+            if decompress is not None:
+                data = decompress(data)
+            block = pickle.loads(data)
+        yield block
+
+
+def _load(partition_id, codec=None, keep=False, stats=None):
     """
     Load a partition from an external source.
 
-    The default implementation yields items loaded and unpickled from a temporary file. After all
-    items have been loaded the temporary file is removed.
+    The default implementation yields items loaded and unpickled from a temporary file one block
+    at a time. After all items have been loaded the temporary file is removed.
 
     :param partition_id: Unique identifier which can be used to reload the partition. In the case
                          of the default implemenation this is the path to the temporary file to
                          load.
 
+    :param codec:        If set, the codec which was used to compress the partition, see
+                         ``_codec``.
+
+    :param keep:         If set to ``True``, the temporary file is not removed after it has been
+                         loaded.
+
+    :param stats:        If set, a ``collections.Counter`` which is updated with the time spent
+                         reading and deserializing blocks, see ``_read_blocks``.
+
     :return: iterable which is loaded from the external source using partition_id.
     """
     if os.path.exists(partition_id):
         try:
-            with suppress(EOFError), open(partition_id, 'rb') as fileobj:
-                while True:
-                    yield pickle.load(fileobj)
+            with open(partition_id, 'rb') as fileobj:
+                for block in _read_blocks(fileobj, codec, stats):
+                    for item in block:
+                        yield item
         finally:
+            if not keep:
+                os.unlink(partition_id)
+
+
+def _fsync(path):
+    """
+    Flush a file which has already been written and closed to disk.
+    """
+    with open(path, 'rb') as fileobj:
+        os.fsync(fileobj.fileno())
+
+
+def _describe(value):
+    """
+    Describe a value which configures a sort, so that it can be compared with the description of
+    the configuration of a sort run in another process.
+
+    Functions are described by their qualified name and other callables by their type, so a
+    ``ValueError`` is raised for lambdas and nested functions, whose names do not tell them apart.
+
+    :param value: A callable, which may be a ``functools.partial``, or an option.
+
+    :return: JSON serializable description of value.
+    """
+    if isinstance(value, partial):
+        keywords = sorted((k, _describe(v)) for k, v in value.keywords.items())
+        return [_describe(value.func), [_describe(arg) for arg in value.args], keywords]
+    if isinstance(value, (list, tuple)):
+        return [_describe(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if callable(value):
+        name = getattr(value, '__qualname__', getattr(value, '__name__', type(value).__name__))
+        if '<' in name:
+            raise ValueError('{0} can not be used to resume a sort, use a module level '
+                             'function instead'.format(name))
+        return '{0}.{1}'.format(getattr(value, '__module__', None), name)
+    # the state of other objects, like a stats counter, is not part of the configuration.
+    return type(value).__name__
+
+
+def _fingerprint(configuration, first):
+    """
+    Fingerprint of a sort, made of it's configuration and the first item of it's input.
+
+    :param configuration: List of the callables and options which configure the sort.
+
+    :param first:         List of the first item of the input, or an empty list.
+
+    :return: Hex digest which is the same for the same sort of the same input.
+    """
+    digest = hashlib.sha1(json.dumps(_describe(configuration)).encode('utf-8'))
+    digest.update(pickle.dumps(first, 2))
+    return digest.hexdigest()
+
+
+class _Checkpoint(object):
+    """
+    Durable record of the progress of a sort in a work directory, so that a sort which is
+    interrupted can be resumed without sorting the input again.
+
+    Runs are serialized to a subdirectory of the work directory which is owned by the sort. While
+    the input is being split, each run is appended to a journal together with the number of input
+    items which it holds, in the order of the input. Once the whole input has been split, the runs
+    are recorded in the manifest, and after each intermediate merge pass they are replaced by the
+    output of the pass. Runs are only removed once they have been replaced, or when the sort has
+    completed.
+
+    The manifest also records the fingerprint of the sort, a sort with a different fingerprint can
+    not be resumed from the work directory.
+    """
+
+    def __init__(self, work_dir, fingerprint):
+        self.work_dir = os.path.abspath(work_dir)
+        self.path = os.path.join(self.work_dir, _MANIFEST)
+        self.journal_path = os.path.join(self.work_dir, _JOURNAL)
+        self.runs_dir = os.path.join(self.work_dir, _RUNS)
+        self.journal = None
+        if not os.path.isdir(self.work_dir):
+            os.makedirs(self.work_dir)
+        if os.path.exists(self.path):
+            with open(self.path) as fileobj:
+                self.manifest = json.load(fileobj)
+            if self.manifest['fingerprint'] != fingerprint:
+                raise ValueError('{0} holds the checkpoint of a different sort, remove it to start '
+                                 'again'.format(self.work_dir))
+        elif set(os.listdir(self.work_dir)) - set([_RUNS]):
+            raise ValueError('{0} is not empty and holds no checkpoint, work_dir should be a '
+                             'directory dedicated to the sort'.format(self.work_dir))
+        else:
+            # runs without a manifest are left over from a sort which completed.
+            if os.path.isdir(self.runs_dir):
+                shutil.rmtree(self.runs_dir)
+            self.manifest = {'fingerprint': fingerprint, 'runs': [], 'offset': 0, 'split': False}
+            self._save()
+        if not os.path.isdir(self.runs_dir):
+            os.makedirs(self.runs_dir)
+        if not self.split:
+            self._replay_journal()
+        # runs which are not recorded are left over from a run or pass which was interrupted.
+        runs = set(self.manifest['runs'])
+        for name in os.listdir(self.runs_dir):
+            if name not in runs:
+                os.unlink(os.path.join(self.runs_dir, name))
+
+    def _replay_journal(self):
+        """
+        Add the runs in the journal to the manifest, dropping a last entry which was only partly
+        written, and rewrite the journal with only complete entries.
+        """
+        entries = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path) as fileobj:
+                for line in fileobj:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+        for name, size in entries:
+            self.manifest['runs'].append(name)
+            self.manifest['offset'] += size
+        path = self.journal_path + '.tmp'
+        with open(path, 'w') as fileobj:
+            fileobj.writelines(json.dumps(entry) + '\n' for entry in entries)
+        _replace(path, self.journal_path)
+
+    @property
+    def runs(self):
+        """
+        The ids of the runs which have been recorded.
+        """
+        return [os.path.join(self.runs_dir, name) for name in self.manifest['runs']]
+
+    @property
+    def offset(self):
+        """
+        The number of input items which have been serialized in the recorded runs.
+        """
+        return self.manifest['offset']
+
+    @property
+    def split(self):
+        """
+        ``True`` if the whole input has been split into runs.
+        """
+        return self.manifest['split']
+
+    def _save(self):
+        path = self.path + '.tmp'
+        with open(path, 'w') as fileobj:
+            json.dump(self.manifest, fileobj)
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+        _replace(path, self.path)
+
+    def add_run(self, partition_id, size):
+        """
+        Record a run holding the next size items of the input. The run is flushed to disk before
+        it is appended to the journal, an entry which is lost only means the run is sorted again.
+        """
+        _fsync(partition_id)
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a')
+        name = os.path.basename(partition_id)
+        self.journal.write(json.dumps([name, size]) + '\n')
+        self.journal.flush()
+        self.manifest['runs'].append(name)
+        self.manifest['offset'] += size
+
+    def split_done(self):
+        """
+        Record that the whole input has been split into runs, the journal is no longer needed.
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.manifest['split'] = True
+        self._save()
+        os.unlink(self.journal_path)
+
+    def replace_runs(self, partition_ids):
+        """
+        Record the runs written by a merge pass and remove the runs which they replace.
+        """
+        for partition_id in partition_ids:
+            _fsync(partition_id)
+        replaced = self.runs
+        self.manifest['runs'] = [os.path.basename(x) for x in partition_ids]
+        self._save()
+        for partition_id in replaced:
             os.unlink(partition_id)
-    else:
-        raise StopIteration()
+
+    def complete_after(self, merged):
+        """
+        Remove the runs, the journal and the manifest after all items of merged have been
+        returned.
+        """
+        for item in merged:
+            yield item
+        # the manifest goes first, a manifest without it's runs would resume as an empty sort.
+        os.unlink(self.path)
+        shutil.rmtree(self.runs_dir)
+
+
+def _partition(partition_size, iterable):
+    """
+    Split iterable into lists of partition_size items (the last list may have fewer items). Unlike
+    ``toolz.partition_all`` no items are read ahead of the partition which is being returned.
+
+    :param partition_size: The number of items to place in each partition.
+
+    :param iterable:       The iterable to partition.
+
+    :return: iterable of lists of items.
+    """
+    iterator = iter(iterable)
+    while True:
+        partition = list(islice(iterator, partition_size))
+        if not partition:
+            return
+        yield partition
+
+
+def _sizeof(item):
+    """
+    Estimate the number of bytes of memory used by item.
+
+    The estimate is the size of the item itself plus the size of the objects directly contained
+    in it when the item is a builtin container, which covers the common cases of records read from
+    csv files or databases without the cost of a full recursive traversal.
+
+    :param item: The item to estimate the size of.
+
+    :return: The estimated size of item in bytes.
+    """
+    size = sys.getsizeof(item)
+    if isinstance(item, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in item.items())
+    elif isinstance(item, (list, tuple, set, frozenset)):
+        size += sum(map(sys.getsizeof, item))
+    return size
+
+
+def _take_by_memory(memory_limit, first, iterator, sizeof=_sizeof):
+    """
+    Take items from iterator, starting with first, until the estimated memory used by the items
+    taken would exceed memory_limit. At least one item is always taken.
+
+    :param memory_limit: The maximum number of bytes the items taken should use.
+
+    :param first:        The first item to take.
+
+    :param iterator:     Iterator to take the following items from.
+
+    :param sizeof:       Callable which returns the estimated size of an item in bytes.
+
+    :return: tuple of the list of items taken and a list containing the item which would have
+             exceeded memory_limit, which is empty if iterator was exhausted.
+    """
+    partition, used = [first], sizeof(first) + _POINTER_SIZE
+    for item in iterator:
+        size = sizeof(item) + _POINTER_SIZE
+        if used + size > memory_limit:
+            return partition, [item]
+        partition.append(item)
+        used += size
+    return partition, []
+
+
+def _partitions(partition_size, iterable, memory_limit=None):
+    """
+    Split iterable into lists of partition_size items, or of items using up to memory_limit bytes
+    if set, paired with whether it is the last partition. An item which is by itself larger than
+    memory_limit is placed in a partition of it's own. Only the first item of the following
+    partition is read ahead.
+
+    :param partition_size: The number of items to place in each partition.
+
+    :param iterable:       The iterable to partition.
+
+    :param memory_limit:   If set, the maximum number of bytes each partition should use.
+
+    :return: iterable of tuples of a list of items and ``True`` if it is the last list.
+    """
+    iterator = iter(iterable)
+    head = _take(1, iterator)
+    while head:
+        if memory_limit is None:
+            partition = head + _take(partition_size - 1, iterator)
+            head = _take(1, iterator)
+        else:
+            partition, head = _take_by_memory(memory_limit, head[0], iterator)
+        yield partition, not head
+
+
+class _Resident(object):
+    """
+    Id of a partition which is kept in memory instead of being serialized, it is loaded by
+    iterating the items directly rather than by calling load.
+    """
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+
+class _Chained(object):
+    """
+    Id of a partition which was serialized in several pieces, it is loaded by loading each of the
+    pieces in turn.
+    """
+    __slots__ = ('partition_ids',)
+
+    def __init__(self, partition_ids):
+        self.partition_ids = partition_ids
+
+
+def _load_resident(load, partition_id):
+    """
+    Load a partition which may have been kept in memory or serialized in several pieces.
+
+    :param load:         Callable which loads partitions which have been serialized.
+
+    :param partition_id: Either a ``_Resident``, a ``_Chained`` or an id which load can be called
+                         with.
+
+    :return: iterable of the items in the partition.
+    """
+    if isinstance(partition_id, _Resident):
+        return iter(partition_id.items)
+    if isinstance(partition_id, _Chained):
+        return itertools.chain.from_iterable(
+            _load_resident(load, piece) for piece in partition_id.partition_ids)
+    return load(partition_id)
+
+
+def _sort_and_dump(dump, key, reverse, partition):
+    """
+    Sort the given partition and serialize it using dump. This is a module level function so that
+    it can be sent to worker processes.
+
+    :param dump:      Callable which serializes the sorted partition.
+
+    :param key:       ``sorted`` key parameter.
+
+    :param reverse:   ``sorted`` reverse parameter.
+
+    :param partition: The partition of items to sort and serialize.
+
+    :return: The id returned by dump.
+    """
+    return dump(sorted(partition, key=key, reverse=reverse))
+
+
+def _map_bounded(executor, max_in_flight, func, iterable):
+    """
+    Like ``executor.map`` but only submits up to max_in_flight calls ahead of the results which
+    have been consumed, so that iterable is not read into memory all at once.
+
+    :param executor:      ``concurrent.futures.Executor`` to submit calls to.
+
+    :param max_in_flight: The maximum number of submitted calls which have not been consumed.
+
+    :param func:          Callable to call with each item of iterable.
+
+    :param iterable:      The items to call func with.
+
+    :return: iterable of the results of func, in the order of iterable.
+    """
+    in_flight = collections.deque()
+    for item in iterable:
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+        in_flight.append(executor.submit(func, item))
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+class _Limit(object):
+    """
+    Keeps track of an upper bound of the key of the limit-th item in sorted order of the partitions
+    seen so far, so that items which cannot be among the first limit items can be dropped before
+    they are serialized.
+
+    The bound is the smallest last key of a partition for which the partitions ending with that key
+    or before hold at least limit items.
+    """
+    def __init__(self, limit, key=None, reverse=False):
+        self.limit = limit
+        self.key = key if key is not None else (lambda item: item)
+        self.reverse = reverse
+        self.before = operator.gt if reverse else operator.lt
+        self.threshold = None
+        self.full = False
+        self.partitions = []
+
+    def filter(self, iterable):
+        """
+        Drop the items of iterable which sort after, or the same as, the bound. Since those items
+        follow at least limit items in the input which sort before them or the same, sorting is
+        still stable.
+
+        :param iterable: The items to filter.
+
+        :return: iterable of the items which may be among the first limit items.
+        """
+        key, before = self.key, self.before
+        for item in iterable:
+            if not self.full or before(key(item), self.threshold):
+                yield item
+
+    def truncate(self, partition):
+        """
+        Sort partition and keep only it's first limit items, updating the bound.
+
+        :param partition: List of items.
+
+        :return: List of at most limit items in sorted order.
+        """
+        partition = sorted(partition, key=self.key, reverse=self.reverse)[:self.limit]
+        if partition:
+            self.partitions.append((self.key(partition[-1]), len(partition)))
+            self.partitions.sort(key=_stored_key, reverse=self.reverse)
+            count = 0
+            for i, (last, size) in enumerate(self.partitions):
+                count += size
+                if count >= self.limit:
+                    self.threshold, self.full = last, True
+                    # partitions ending after the bound can not tighten it any further.
+                    del self.partitions[i + 1:]
+                    break
+        return partition
 
 
-def _split(dump, partition_size, iterable, key=None, reverse=False):
+def _split(dump, partition_size, iterable, key=None, reverse=False, memory_limit=None,
+           workers=None, background=False, keep_last=True, limit=None, checkpoint=None,
+           stats=None):
     """
     Spit iterable into a number of sorted partitions of size partition_size (the last partition
     may have fewer items) and serialize using the dump callable.
@@ -87,18 +854,485 @@ def _split(dump, partition_size, iterable, key=None, reverse=False):
     :param reverse:         If set to ``True``, then the list elements are sorted as if each
                             comparison were reversed.
 
+    :param memory_limit:    If set, partitions are sized by the estimated number of bytes used
+                            by their items instead of by partition_size.
+
+    :param workers:         If set, the number of worker processes used to sort and serialize
+                            partitions in parallel, dump, key and the items must be pickleable.
+
+    :param background:      If set to ``True``, partitions are sorted and serialized in a
+                            background thread while the next partition is read from iterable.
+                            At most one partition is serialized while the next is being filled.
+
+    :param keep_last:       If set to ``True``, the last partition is not serialized but kept
+                            in memory for merging, so that an iterable which fits in a single
+                            partition is sorted without serializing anything.
+
+    :param limit:           If set, only the first limit items in sorted order are needed, each
+                            partition is truncated to limit items and items which cannot be
+                            among the first limit items are dropped before being partitioned.
+
+    :param checkpoint:      If set, the ``_Checkpoint`` which each serialized partition is
+                            recorded in, in the order of the input.
+
+    :param stats:           If set, a ``collections.Counter`` which is updated with the number of
+                            ``runs`` serialized, ``items_spilled``, ``bytes_spilled``,
+                            ``max_run_items``, ``max_run_bytes`` and ``items_resident`` kept in
+                            memory. Unless partitions are serialized by worker processes or a
+                            background thread, the wall and cpu time spent sorting and
+                            serializing partitions is timed as the ``sort`` and ``dump`` phases.
+
+    :return: iterable of the ids which can be used to reload the externalized partitions.
+    """
+    last, sizes = [], collections.deque()
+    if limit is not None:
+        limited = _Limit(limit, key, reverse)
+        iterable = limited.filter(iterable)
+
+    def partitioned():
+        for partition, is_last in _partitions(partition_size, iterable, memory_limit):
+            if limit is not None:
+                partition = limited.truncate(partition)
+            if is_last and keep_last:
+                last.append(partition)
+            else:
+                sizes.append(len(partition))
+                yield partition
+
+    def recorded(partition_ids):
+        for partition_id in partition_ids:
+            size = sizes.popleft()
+            if checkpoint is not None:
+                checkpoint.add_run(partition_id, size)
+            _record_run(stats, partition_id, size)
+            yield partition_id
+
+    # partitions are already sorted by limited.truncate.
+    presorted = limit is not None
+
+    def sort(partition):
+        return partition if presorted else sorted(partition, key=key, reverse=reverse)
+
+    def dump_sorted(partition):
+        with _timed(stats, 'sort'):
+            partition = sort(partition)
+        with _timed(stats, 'dump'):
+            return dump(partition)
+
+    if workers is not None:
+        executor, max_in_flight = ProcessPoolExecutor(workers), 2 * workers
+    elif background:
+        executor, max_in_flight = ThreadPoolExecutor(1), 1
+    else:
+        executor = None
+    if executor is None:
+        partition_ids = list(recorded(dump_sorted(x) for x in partitioned()))
+    else:
+        with executor:
+            sort_and_dump = dump if presorted else partial(_sort_and_dump, dump, key, reverse)
+            partition_ids = list(recorded(
+                _map_bounded(executor, max_in_flight, sort_and_dump, partitioned())))
+    for partition in last:
+        if stats is not None:
+            stats['items_resident'] += len(partition)
+        with _timed(stats, 'sort'):
+            partition_ids.append(_Resident(sort(partition)))
+    return partition_ids
+
+
+class _Reversed(object):
+    """
+    Wraps a sort key so that it compares in reverse order, for use in a heap.
+    """
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+def _replacement_selection_run(heap, run, iterator, sort_key, sequence):
+    """
+    Yield the items of one run generated by replacement selection, the smallest item in the heap
+    is replaced by the next item from iterator, which joins the current run if it is not smaller
+    than the item being output and the next run otherwise.
+
+    :param heap:     Heap of (run, sort key, sequence number, item) tuples.
+
+    :param run:      The number of the run to generate.
+
+    :param iterator: Iterator of the items still to be placed in the heap.
+
+    :param sort_key: Callable returning the key which the heap is ordered by.
+
+    :param sequence: Iterator of sequence numbers, used to keep the runs stable.
+
+    :return: iterable of the items of the run in sorted order.
+    """
+    while heap and heap[0][0] == run:
+        _, key, _, item = heap[0]
+        try:
+            following = next(iterator)
+        except StopIteration:
+            heapq.heappop(heap)
+        else:
+            following_key = sort_key(following)
+            following_run = run + 1 if following_key < key else run
+            heapq.heapreplace(heap, (following_run, following_key, next(sequence), following))
+        yield item
+
+
+def split_replacement_selection(dump, partition_size, iterable, key=None, reverse=False,
+                                stats=None):
+    """
+    Splitter for ``xsorter`` which uses replacement selection to generate the sorted partitions.
+
+    A heap of partition_size items is used to generate each run, on random input the runs are on
+    average twice as long as partition_size, on input which is already nearly sorted far fewer runs
+    are generated. Since each run is generated lazily, dump must consume the iterable it is given
+    before returning.
+
+    :param dump:            Callable which takes an iterable and serializes to some external
+                            source, returning an iterable of ids which can be used to reload the
+                            externalized partitions.
+
+    :param partition_size:  The number of items to hold in the heap.
+
+    :param iterable:        The iterable to split into sorted partitions.
+
+    :param key:             Callable which is used to retrieve the field to sort by.
+
+    :param reverse:         If set to ``True``, then the list elements are sorted as if each
+                            comparison were reversed.
+
+    :param stats:           If set, a ``collections.Counter`` which is updated with the number of
+                            ``runs`` serialized, ``bytes_spilled`` and ``max_run_bytes``.
+
+    :return: iterable of the ids which can be used to reload the externalized partitions.
+    """
+    sort_key = key if key is not None else (lambda item: item)
+    if reverse:
+        sort_key = compose(_Reversed, sort_key)
+    iterator = iter(iterable)
+    sequence = itertools.count()
+    heap = [(0, sort_key(item), next(sequence), item)
+            for item in islice(iterator, partition_size)]
+    heapq.heapify(heap)
+    partition_ids = []
+    while heap:
+        run = heap[0][0]
+        partition_ids.append(dump(_replacement_selection_run(heap, run, iterator, sort_key,
+                                                             sequence)))
+        _record_run(stats, partition_ids[-1])
+    return partition_ids
+
+
+def _out_of_order(reverse):
+    """
+    Get the comparison which is used to detect consecutive items which are not in sorted order.
+
+    :param reverse: ``sorted`` reverse parameter.
+
+    :return: Callable which takes the keys of two consecutive items and returns ``True`` if they
+             are not in sorted order.
+    """
+    return operator.lt if reverse else operator.gt
+
+
+def _pairs_out_of_order(items, key=None, reverse=False):
+    """
+    Compare the keys of each pair of consecutive items.
+
+    :return: iterable of booleans which are ``True`` for each pair of consecutive items which are
+             not in sorted order.
+    """
+    keys = items if key is None else (key(item) for item in items)
+    out_of_order = _out_of_order(reverse)
+    return (out_of_order(a, b) for a, b in sliding_window(2, keys))
+
+
+def _is_ordered(items, key=None, reverse=False):
+    """
+    Check whether items are already in sorted order.
+
+    :param items:   The items to check.
+
+    :param key:     ``sorted`` key parameter.
+
+    :param reverse: ``sorted`` reverse parameter.
+
+    :return: ``True`` if sorting items would not change their order.
+    """
+    return not any(_pairs_out_of_order(items, key, reverse))
+
+
+def _is_reversed(items, key=None, reverse=False):
+    """
+    Check whether items are strictly in the opposite of sorted order, so that sorting them is the
+    same as reversing them.
+
+    :param items:   The items to check, at least two.
+
+    :param key:     ``sorted`` key parameter.
+
+    :param reverse: ``sorted`` reverse parameter.
+
+    :return: ``True`` if every pair of consecutive items is out of order.
+    """
+    return all(_pairs_out_of_order(items, key, reverse))
+
+
+def _natural_run(partition, iterator, key, reverse, pending):
+    """
+    Yield the items of a partition which is already sorted, extended by the items from iterator
+    which continue the sorted order. The first item which does not is appended to pending.
+
+    :param partition: List of items which is already in sorted order.
+
+    :param iterator:  Iterator of the items which follow partition.
+
+    :param key:       ``sorted`` key parameter.
+
+    :param reverse:   ``sorted`` reverse parameter.
+
+    :param pending:   List the first item which does not continue the run is appended to.
+
+    :return: iterable of the items in the run.
+    """
+    key = key if key is not None else (lambda item: item)
+    out_of_order = _out_of_order(reverse)
+    for item in partition:
+        yield item
+    last = key(partition[-1])
+    for item in iterator:
+        item_key = key(item)
+        if out_of_order(last, item_key):
+            pending.append(item)
+            return
+        yield item
+        last = item_key
+
+
+def _reversed_run(dump, partition_size, partition, iterator, key, reverse, pending):
+    """
+    Serialize a partition which is strictly in the opposite of sorted order, extended by the items
+    from iterator which continue that order. At most partition_size items are held in memory, each
+    piece of the run is reversed and serialized on it's own and the pieces are chained so that the
+    last piece is loaded first. The first item which does not continue the run is appended to
+    pending.
+
+    :param dump:           Callable which serializes an iterable, returning an id.
+
+    :param partition_size: The number of items to reverse and serialize in each piece.
+
+    :param partition:      List of items which is strictly in the opposite of sorted order.
+
+    :param iterator:       Iterator of the items which follow partition.
+
+    :param key:            ``sorted`` key parameter.
+
+    :param reverse:        ``sorted`` reverse parameter.
+
+    :param pending:        List the first item which does not continue the run is appended to.
+
+    :return: The id of the run, a ``_Chained`` id if it was serialized in more than one piece.
+    """
+    key = key if key is not None else (lambda item: item)
+    out_of_order = _out_of_order(reverse)
+    partition_ids = []
+    while partition:
+        last = key(partition[-1])
+        partition.reverse()
+        partition_ids.append(dump(partition))
+        partition = []
+        if pending:
+            break
+        for item in iterator:
+            item_key = key(item)
+            if not out_of_order(last, item_key):
+                pending.append(item)
+                break
+            partition.append(item)
+            last = item_key
+            if len(partition) == partition_size:
+                break
+    if len(partition_ids) == 1:
+        return partition_ids[0]
+    return _Chained(partition_ids[::-1])
+
+
+def split_natural_runs(dump, partition_size, iterable, key=None, reverse=False, stats=None):
+    """
+    Splitter for ``xsorter`` which exploits the order already present in iterable.
+
+    When iterable is a sequence which is already sorted, it is kept in memory and nothing is
+    serialized. Whether any other iterable is sorted is only known once it has been read, so it is
+    serialized, but as a single run which is loaded without a merge. iterable is read in partitions
+    of partition_size items, a partition which is already sorted is extended with the following
+    items for as long as they remain sorted and serialized without being sorted, a partition which
+    is strictly in the opposite order is extended in the same way and reversed a partition at a
+    time, see ``_reversed_run``, and any other partition is sorted. Since natural runs are
+    generated lazily, dump must consume the iterable it is given before returning.
+
+    :param dump:            Callable which takes an iterable and serializes to some external
+                            source, returning an iterable of ids which can be used to reload the
+                            externalized partitions.
+
+    :param partition_size:  The number of items to place in each partition which is sorted.
+
+    :param iterable:        The iterable to split into sorted partitions.
+
+    :param key:             Callable which is used to retrieve the field to sort by.
+
+    :param reverse:         If set to ``True``, then the list elements are sorted as if each
+                            comparison were reversed.
+
+    :param stats:           If set, a ``collections.Counter`` which is updated with the number of
+                            ``runs`` serialized, ``bytes_spilled`` and ``max_run_bytes``.
+
     :return: iterable of the ids which can be used to reload the externalized partitions.
     """
-    sort_by_key_and_maybe_reverse = partial(sorted, key=key, reverse=reverse)
-    partitioned = partition_all(partition_size, iterable)
-    dump_sorted = compose(dump, sort_by_key_and_maybe_reverse)
-    return [dump_sorted(x) for x in partitioned]
+    if isinstance(iterable, Sequence) and _is_ordered(iterable, key, reverse):
+        return [_Resident(iterable)] if iterable else []
+    iterator = iter(iterable)
+    pending = []
+    partition_ids = []
+    while True:
+        partition = pending + _take(partition_size - len(pending), iterator)
+        del pending[:]
+        if not partition:
+            return partition_ids
+        if len(partition) > 1 and _is_reversed(partition, key, reverse):
+            partition_ids.append(
+                _reversed_run(dump, partition_size, partition, iterator, key, reverse, pending))
+        elif _is_ordered(partition, key, reverse):
+            partition_ids.append(dump(_natural_run(partition, iterator, key, reverse, pending)))
+        else:
+            partition_ids.append(dump(sorted(partition, key=key, reverse=reverse)))
+        _record_run(stats, partition_ids[-1])
+
+
+def _read_ahead(executor, read_ahead, iterable):
+    """
+    Iterate iterable while reading the next read_ahead items in the background using executor, so
+    that a partition is read in large sequential reads instead of one item at a time.
+
+    :param executor:   ``concurrent.futures.Executor`` used to read items in the background.
+
+    :param read_ahead: The number of items to read at a time.
+
+    :param iterable:   The iterable to read ahead from.
+
+    :return: iterable of the items in iterable.
+    """
+    take = partial(_take, read_ahead, iter(iterable))
+    future = executor.submit(take)
+    while True:
+        items = future.result()
+        if not items:
+            return
+        future = executor.submit(take)
+        for item in items:
+            yield item
+
+
+def _take(n, iterator):
+    """
+    Take the next n items from iterator, fewer if iterator is exhausted.
+
+    :return: list of the items taken.
+    """
+    return list(islice(iterator, n))
+
+
+def _shutdown_after(executor, iterable):
+    """
+    Iterate iterable and shutdown executor once iterable is exhausted or closed.
+    """
+    with executor:
+        for item in iterable:
+            yield item
+
+
+def _combine_sorted(key, combine, items):
+    """
+    Combine the consecutive items of a sorted iterable which have the same key.
+
+    :param key:     ``sorted`` key parameter.
 
+    :param combine: Callable taking two items with the same key and returning the item which
+                    replaces them.
 
-def _merge(load, partition_ids, key=None, reverse=False):
+    :param items:   The sorted items to combine.
+
+    :return: iterable with one item for each distinct key.
+    """
+    for _, group in itertools.groupby(items, key):
+        yield reduce(combine, group)
+
+
+def _dump_combined(dump, key, combine, partition):
+    """
+    Combine the items of a sorted partition which have the same key before serializing it using
+    dump. This is a module level function so that it can be sent to worker processes.
+
+    :return: The id returned by dump.
+    """
+    return dump(_combine_sorted(key, combine, partition))
+
+
+def _keep_first(first, _):
+    """
+    Combiner which keeps the first of two items with the same key.
+    """
+    return first
+
+
+def _add_counts(first, second):
+    """
+    Combiner of (item, count) pairs which keeps the first item and adds the counts.
+    """
+    return first[0], first[1] + second[1]
+
+
+def _counted_key(key, pair):
+    """
+    Sort key of an (item, count) pair.
+    """
+    return pair[0] if key is None else key(pair[0])
+
+
+def _keyed(key, iterable):
+    """
+    Decorate each item of iterable with its key, so that the key is serialized with the item.
+
+    :return: iterable of (key, item) pairs.
+    """
+    for item in iterable:
+        yield key(item), item
+
+
+def _combine_stored(combine, first, second):
+    """
+    Combiner of the (key, item) pairs which are serialized when keys are stored.
+    """
+    return first[0], combine(first[1], second[1])
+
+
+def _merge(load, partition_ids, key=None, reverse=False, dump=None, max_fan_in=None,
+           stats=None, read_ahead=None, combine=None, checkpoint=None):
     """
     Merge and sort externalized partitions.
 
+    When there are more partitions than max_fan_in, consecutive groups of max_fan_in partitions
+    are merged and serialized using dump into larger partitions, in as many intermediate passes as
+    required, before the final pass which is merged lazily.
+
     :param load:          Callable which loads and returns an iterable for iterating the
                           externalized partitions.
 
@@ -108,12 +1342,67 @@ def _merge(load, partition_ids, key=None, reverse=False):
 
     :param reverse:       ``sorted`` reverse parameter.
 
+    :param dump:          Callable which is used to serialize the partitions created by an
+                          intermediate pass, required when max_fan_in is set.
+
+    :param max_fan_in:    If set, the maximum number of partitions which are merged at once.
+
+    :param stats:         If set, a ``collections.Counter`` which is updated with the number of
+                          merge passes which were run under ``merge_passes``, the largest number
+                          of partitions merged at once under ``max_merge_fan_in`` and the wall
+                          and cpu time of the ``merge`` phase, which includes loading the
+                          partitions and serializing the output of intermediate passes.
+
+    :param read_ahead:    If set, the number of items which are read ahead from each partition
+                          by a pool of background threads.
+
+    :param combine:       If set, callable taking two items with the same key and returning the
+                          item which replaces them, which is applied to the output of every pass.
+
+    :param checkpoint:    If set, the ``_Checkpoint`` which the output of each intermediate pass
+                          is recorded in.
+
     :return: iterable of merged partitions.
     """
-    return merge(*map(load, partition_ids), key=key, reverse=reverse)
+    if read_ahead is not None:
+        executor = ThreadPoolExecutor(_READ_AHEAD_THREADS)
+        load = compose(partial(_read_ahead, executor, read_ahead), load)
+        merged = _merge(load, partition_ids, key, reverse, dump, max_fan_in, stats,
+                        combine=combine, checkpoint=checkpoint)
+        return _shutdown_after(executor, merged)
+
+    def merge_group(group):
+        if stats is not None:
+            stats['max_merge_fan_in'] = max(stats['max_merge_fan_in'], len(group))
+        if len(group) == 1:
+            merged = load(group[0])
+        else:
+            merged = merge(*map(load, group), key=key, reverse=reverse)
+        return merged if combine is None else _combine_sorted(key, combine, merged)
+
+    partition_ids = list(partition_ids)
+    if max_fan_in is not None:
+        if max_fan_in < 2:
+            raise ValueError('max_fan_in must be at least 2, got {0}'.format(max_fan_in))
+        while len(partition_ids) > max_fan_in:
+            with _timed(stats, 'merge'):
+                partition_ids = [
+                    dump(merge_group(group))
+                    for group in partition_all(max_fan_in, partition_ids)
+                ]
+            if checkpoint is not None:
+                checkpoint.replace_runs(partition_ids)
+            if stats is not None:
+                stats['merge_passes'] += 1
+    if stats is None:
+        return merge_group(partition_ids)
+    stats['merge_passes'] += 1
+    return _timed_iter(stats, 'merge', merge_group(partition_ids))
 
 
-def _xsorted(partition_size, dump, load, split, merge, iterable, key=None, reverse=False):
+def _xsorted(partition_size, dump, load, split, merge, iterable, key=None, reverse=False,
+             store_keys=False, limit=None, unique=False, counts=False, combine=None,
+             work_dir=None, stats=None, memory_limit=None):
     """
     xsorted implementation where dependencies should be injected, athough it is possible to use
     this function directly the xsorter function should be used to pre-bind the dependencies for
@@ -146,13 +1435,101 @@ def _xsorted(partition_size, dump, load, split, merge, iterable, key=None, rever
     :param reverse:            If set to ``True``, then the list elements are sorted as if each
                                comparison were reversed.
 
+    :param store_keys:         If set to ``True``, key is called once for each item and the
+                               result is serialized alongside the item, then the stored keys are
+                               used when merging instead of calling key again.
+
+    :param limit:              If set, only the first limit items in sorted order are returned.
+                               When limit is not more than partition_size and memory_limit is not
+                               set they are selected in memory using a heap without serializing
+                               anything, otherwise limit is passed on to split if it accepts it.
+
+    :param unique:             If set to ``True``, only the first of the items with the same key
+                               is returned. Duplicates are removed from each partition before it
+                               is serialized and again when merging.
+
+    :param counts:             If set to ``True``, like unique but (item, count) pairs are returned
+                               where count is the number of items with the same key.
+
+    :param combine:            If set, associative callable taking two items with the same key and
+                               returning the item which replaces them, so that one item is returned
+                               for each key. Like unique it is applied to each partition before it
+                               is serialized and again when merging.
+
+    :param work_dir:           If set, the directory in which the progress of the sort is recorded,
+                               see ``_Checkpoint``. If a previous sort using work_dir was
+                               interrupted, the partitions it serialized are merged instead of
+                               being sorted again and the items of iterable which they hold are
+                               skipped, so iterable must return the same items in the same order.
+                               A ``ValueError`` is raised if the previous sort had different
+                               options or a different first item, or if work_dir holds other
+                               files. Callables are compared by name, see ``_describe``, so key
+                               and combine can not be lambdas or nested functions. split and
+                               merge must accept a checkpoint.
+
+    :param stats:              If set, a ``collections.Counter`` which is updated with the wall and
+                               cpu time of the ``split`` phase, which includes reading iterable.
+
+    :param memory_limit:       The memory_limit bound to split, if any. Partitions are then sized
+                               by bytes, so limit items may not fit in memory whatever their
+                               number.
+
     :return: an iterable which returns the elements of the input iterable in sorted order.
     """
-    partition_ids = split(dump, partition_size, iterable, key, reverse)
-    return merge(load, partition_ids, key, reverse)
+    if sum((unique, counts, combine is not None)) > 1:
+        raise ValueError('only one of unique, counts and combine can be set')
+    if work_dir is not None and limit is not None:
+        raise ValueError('limit can not be used together with work_dir')
+    load = partial(_load_resident, load)
+    if counts:
+        iterable = ((item, 1) for item in iterable)
+        key, combine = partial(_counted_key, key), _add_counts
+    else:
+        combine = _keep_first if unique else combine
+    if limit is not None and combine is None:
+        if limit <= partition_size and memory_limit is None:
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return iter(select(limit, iterable, key=key))
+        if _accepts(split, 'limit'):
+            split = partial(split, limit=limit)
+    # the key of the sort, before it is replaced by the stored keys.
+    sort_key = key
+    stored = store_keys and key is not None
+    if stored:
+        iterable = _keyed(key, iterable)
+        key = _stored_key
+        combine = None if combine is None else partial(_combine_stored, combine)
+    if combine is not None:
+        dump = partial(_dump_combined, dump, key, combine)
+        merge = partial(merge, combine=combine)
+    if work_dir is None:
+        with _timed(stats, 'split'):
+            partition_ids = split(dump, partition_size, iterable, key, reverse)
+        merged = merge(load, partition_ids, key, reverse)
+    else:
+        iterator = iter(iterable)
+        first = _take(1, iterator)
+        iterable = itertools.chain(first, iterator)
+        configuration = [partition_size, reverse, sort_key, dump, split, merge, combine,
+                         store_keys]
+        checkpoint = _Checkpoint(work_dir, _fingerprint(configuration, first))
+        if not checkpoint.split:
+            iterable = islice(iterable, checkpoint.offset, None)
+            with _timed(stats, 'split'):
+                split(dump, partition_size, iterable, key, reverse, checkpoint=checkpoint)
+            checkpoint.split_done()
+        merged = merge(load, checkpoint.runs, key, reverse, checkpoint=checkpoint)
+        merged = checkpoint.complete_after(merged)
+    if stored:
+        merged = (item for _, item in merged)
+    return merged if limit is None else islice(merged, limit)
 
 
-def xsorter(partition_size=1024, dump=_dump, load=_load, split=_split, merge=_merge):
+def xsorter(partition_size=1024, dump=_dump, load=_load, split=_split, merge=_merge,
+            memory_limit=None, block_size=None, max_fan_in=None, stats=None, workers=None,
+            background=False, read_ahead=None, store_keys=False, codec=None, limit=None,
+            unique=False, counts=False, combine=None, work_dir=None, spill_dirs=None,
+            spill_policy='round_robin'):
     """
     Generate an xsorted function using the specified partition size, serializer factory, splitter
     and merger.
@@ -171,16 +1548,125 @@ def xsorter(partition_size=1024, dump=_dump, load=_load, split=_split, merge=_me
                                of sorting.
 
     :param split:              Callable which is used to sort and split the given iterable into
-                               partitions.
+                               partitions, ``split_replacement_selection`` and
+                               ``split_natural_runs`` are alternatives to the default for input
+                               which is partially sorted.
 
     :param merge:              Callable which is used to merge and sort serialized partitions.
 
+    :param memory_limit:       If set, the approximate number of bytes of items to hold in memory
+                               for each partition, which is used instead of partition_size. This
+                               is useful when the size of the items is not known in advance.
+
+    :param block_size:         If set, the number of items the default dump serializes together
+                               in each block, larger blocks mean less overhead per item but more
+                               memory used by each partition during merging.
+
+    :param max_fan_in:         If set, the maximum number of partitions to merge at once. When
+                               there are more partitions than this they are merged in
+                               intermediate passes into larger partitions, which limits the
+                               number of files which are open at the same time.
+
+    :param stats:              If set, a ``collections.Counter`` which is updated with statistics
+                               about each sort: the number and size of the partitions serialized,
+                               see ``_split``, the merge passes and fan in, see ``_merge``, and the
+                               wall and cpu time in seconds of each phase as ``<phase>_wall`` and
+                               ``<phase>_cpu``. The statistics are accumulated over every sort
+                               which uses the xsorted function. A subclass of ``Counter`` can be
+                               used to forward them to a metrics system. The time of the dump
+                               phase includes the ``serialize`` and ``write`` phases and the time
+                               of the merge phase includes the ``read`` and ``deserialize``
+                               phases, which are not recorded for partitions serialized by workers
+                               or a background thread or loaded by read_ahead threads. stats is
+                               only passed to the dump, load, split and merge functions which
+                               accept it.
+
+    :param workers:            If set, the number of processes used to sort and serialize
+                               partitions in parallel. The dump callable, key and items must be
+                               pickleable in order to be sent to the worker processes.
+
+    :param background:         If set to ``True``, partitions are sorted and serialized in a
+                               background thread while the next partition is read from the
+                               iterable, which hides the latency of writing partitions when the
+                               iterable is slow to produce items. Ignored when workers is set.
+
+    :param read_ahead:         If set, the number of items to read ahead from each partition in
+                               background threads while merging, so that partitions are read in
+                               large sequential reads rather than one item at a time.
+
+    :param store_keys:         If set to ``True``, the key of each item is computed only once and
+                               serialized alongside the item, which is useful when key is
+                               expensive to compute.
+
+    :param codec:              If set, the codec which the default dump and load use to compress
+                               partitions block by block. Either ``'zlib'``, ``'bz2'``,
+                               ``'lzma'`` or an object with ``compress`` and ``decompress``
+                               methods which take and return bytes.
+
+    :param limit:              If set, only the first limit items in sorted order are returned,
+                               see ``_xsorted``.
+
+    :param unique:             If set to ``True``, only the first of the items with the same key
+                               is returned, duplicates are removed before being serialized.
+
+    :param counts:             If set to ``True``, like unique but (item, count) pairs are returned
+                               where count is the number of items with the same key.
+
+    :param combine:            If set, associative callable taking two items with the same key and
+                               returning the item which replaces them, see ``_xsorted``. If
+                               workers is set combine must be pickleable.
+
+    :param work_dir:           If set, a directory dedicated to the sort where partitions are
+                               serialized and the progress of the sort is recorded, so that a sort
+                               which is interrupted can be resumed by sorting the same iterable
+                               with the same options again. Partitions are kept until the sort has
+                               completed, see ``_xsorted``.
+
+    :param spill_dirs:         If set, a list of directories which partitions are serialized to
+                               instead of the default temporary directory, typically on different
+                               disks so that they are written and, with read_ahead, read in
+                               parallel and so that the data sorted can be larger than any one of
+                               them. dump must accept a dir keyword argument.
+
+    :param spill_policy:       How the directory of each partition is chosen from spill_dirs,
+                               ``'round_robin'`` to use each in turn or ``'free_space'`` to use the
+                               one with the most free space.
+
     :return: xsorted function.
     """
-    return partial(_xsorted, partition_size, dump, load, split, merge)
+    if codec is not None:
+        # fail early on an unknown codec rather than when the first partition is dumped.
+        _codec(codec)
+    if spill_policy not in _SPILL_POLICIES:
+        raise ValueError('spill_policy should be one of {0}, got {1!r}'.format(
+            ', '.join(sorted(_SPILL_POLICIES)), spill_policy))
+    if spill_dirs is not None and work_dir is not None:
+        raise ValueError('spill_dirs can not be used together with work_dir')
+    checkpointed, timed = work_dir is not None, stats is not None
+    # the statistics of other processes and threads would be lost or updated concurrently.
+    dump = _bind(dump, block_size=block_size, codec=codec,
+                 dir=os.path.join(work_dir, _RUNS) if checkpointed else None,
+                 stats=stats if timed and workers is None and not background and
+                 _accepts(dump, 'stats') else None)
+    if spill_dirs:
+        dump = partial(_dump_striped, list(spill_dirs), spill_policy, _SpillCounter(), dump)
+    load = _bind(load, codec=codec, keep=checkpointed or None,
+                 stats=stats if timed and read_ahead is None and _accepts(load, 'stats')
+                 else None)
+    # a partition kept in memory would be lost if the sort was interrupted.
+    split = _bind(split, memory_limit=memory_limit, workers=workers,
+                  background=background or None, keep_last=False if checkpointed else None,
+                  stats=stats if timed and _accepts(split, 'stats') else None)
+    merge = _bind(merge, max_fan_in=max_fan_in, read_ahead=read_ahead,
+                  stats=stats if timed and _accepts(merge, 'stats') else None,
+                  dump=None if max_fan_in is None else dump)
+    return partial(_xsorted, partition_size, dump, load, split, merge, store_keys=store_keys,
+                   limit=limit, unique=unique, counts=counts, combine=combine,
+                   work_dir=work_dir, stats=stats, memory_limit=memory_limit)
 
 
-def xsorted(iterable, key=None, reverse=False):
+def xsorted(iterable, key=None, reverse=False, workers=None, limit=None, unique=False,
+            counts=False, combine=None):
     """
     Return a new sorted iterable from the items in iterable.
 
@@ -198,6 +1684,25 @@ def xsorted(iterable, key=None, reverse=False):
     :param reverse:  If set to ``True``, then the list elements are sorted as if each comparison
                      were reversed.
 
+    :param workers:  If set, the number of processes used to sort partitions in parallel, in which
+                     case key and the items must be pickleable.
+
+    :param limit:    If set, only the first limit items in sorted order are returned, which avoids
+                     serializing items which cannot be among them.
+
+    :param unique:   If set to ``True``, only the first of the items with the same key is returned.
+
+    :param counts:   If set to ``True``, (item, count) pairs are returned for each distinct key,
+                     where item is the first item with the key and count the number of items with
+                     the key.
+
+    :param combine:  If set, associative callable taking two items with the same key and returning
+                     the item which replaces them, so that one aggregated item is returned for each
+                     key. It is applied before partitions are serialized, which reduces both the
+                     data written to disk and the work done merging.
+
     :return: an iterable which returns the elements of the input iterable in sorted order.
     """
-    return xsorter()(iterable, key, reverse)
+    _xsorted = xsorter(workers=workers, limit=limit, unique=unique, counts=counts,
+                       combine=combine)
+    return _xsorted(iterable, key, reverse)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+asyncio version of ``xsorted`` for sorting asynchronous iterables.
+
+Partitions are sorted and serialized and the merged items are read in an executor, so that the
+event loop is not blocked by file I/O while sorting.
+"""
+# std
+import asyncio
+from functools import partial
+# local
+from xsorted import _dump, _load, _merge, _sort_and_dump, _take, _load_resident, _Resident
+
+
+# the loop of the running coroutine, get_running_loop is only available from python 3.7.
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+async def axsorted(iterable, key=None, reverse=False, partition_size=1024, batch_size=1024,
+                   dump=_dump, load=_load, executor=None):
+    """
+    Return an asynchronous iterator of the items of an asynchronous iterable in sorted order.
+
+    While the next partition is read from iterable, the previous partition is sorted and
+    serialized in executor. While the items of one batch of the merged partitions are yielded, the
+    next batch is read in executor.
+
+    :param iterable:       The asynchronous iterable to be sorted.
+
+    :param key:            Specifies a function of one argument that is used to extract a
+                           comparison key from each list element.
+
+    :param reverse:        If set to ``True``, then the list elements are sorted as if each
+                           comparison were reversed.
+
+    :param partition_size: The number of items to serialize in each partition.
+
+    :param batch_size:     The number of merged items to read in executor at a time.
+
+    :param dump:           Callable used to serialize each sorted partition, see ``xsorter``.
+
+    :param load:           Callable used to load each serialized partition, see ``xsorter``.
+
+    :param executor:       ``concurrent.futures.Executor`` used for blocking work, the default
+                           executor of the event loop if not set.
+
+    :return: asynchronous iterator of the items of iterable in sorted order.
+    """
+    loop = _get_running_loop()
+    dump_sorted = partial(_sort_and_dump, dump, key, reverse)
+    partition_ids = []
+    partition = []
+    pending = None
+    async for item in iterable:
+        partition.append(item)
+        if len(partition) >= partition_size:
+            if pending is not None:
+                partition_ids.append(await pending)
+            pending = loop.run_in_executor(executor, dump_sorted, partition)
+            partition = []
+    if pending is not None:
+        partition_ids.append(await pending)
+    if partition:
+        partition_ids.append(_Resident(sorted(partition, key=key, reverse=reverse)))
+    merged = await loop.run_in_executor(
+        executor, _merge, partial(_load_resident, load), partition_ids, key, reverse)
+    take = partial(_take, batch_size, merged)
+    pending = loop.run_in_executor(executor, take)
+    while True:
+        batch = await pending
+        if not batch:
+            return
+        pending = loop.run_in_executor(executor, take)
+        for item in batch:
+            yield item
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+External sorting of numeric values using NumPy.
+
+Values are buffered into arrays which are sorted using ``np.sort``, serialized as raw ``.npy``
+files and merged in vectorized batches read through memory maps, rather than one python object at
+a time.
+"""
+# future
+from __future__ import division, print_function, absolute_import
+# std
+import os
+import tempfile
+from functools import partial
+from itertools import chain, islice
+# 3rd party
+import numpy as np
+# local
+from xsorted import xsorter, _Resident
+
+
+# default number of values sorted in memory in each partition.
+_PARTITION_SIZE = 1 << 20
+# default number of values in each batch read from a partition and yielded by the merge.
+_BATCH_SIZE = 1 << 16
+
+
+def _batches(array, batch_size, reverse=False):
+    """
+    Split a sorted array into batches of batch_size values.
+
+    :param array:      The array to split, in ascending order.
+
+    :param batch_size: The number of values in each batch.
+
+    :param reverse:    If set to ``True``, the batches are taken from the end of array and are in
+                       descending order.
+
+    :return: iterable of arrays.
+    """
+    if reverse:
+        array = array[::-1]
+    return (array[i:i + batch_size] for i in range(0, len(array), batch_size))
+
+
+def _dump_array(partition):
+    """
+    Dump a sorted array to a temporary ``.npy`` file.
+
+    :param partition: The array to dump.
+
+    :return: The path to the temporary file.
+    """
+    with tempfile.NamedTemporaryFile(suffix='.npy', delete=False) as fileobj:
+        np.save(fileobj, partition)
+        return fileobj.name
+
+
+def _load_array(partition_id, batch_size=_BATCH_SIZE, reverse=False):
+    """
+    Load the array dumped by ``_dump_array`` in batches read through a memory map. After all
+    batches have been loaded the temporary file is removed.
+
+    :param partition_id: The path to the temporary file.
+
+    :param batch_size:   The number of values in each batch.
+
+    :param reverse:      If set to ``True``, the batches are in descending order.
+
+    :return: iterable of arrays.
+    """
+    try:
+        mapped = np.load(partition_id, mmap_mode='r')
+        for batch in _batches(mapped, batch_size, reverse):
+            yield np.array(batch)
+        del mapped
+    finally:
+        os.unlink(partition_id)
+
+
+def _fromiter(partition_size, iterable, dtype):
+    """
+    Split an iterable of numeric values into arrays of partition_size values (the last array may
+    have fewer values).
+
+    :param partition_size: The number of values to place in each array.
+
+    :param iterable:       The iterable of numeric values.
+
+    :param dtype:          The dtype of the arrays.
+
+    :return: iterable of arrays.
+    """
+    iterator = iter(iterable)
+    while True:
+        partition = np.fromiter(islice(iterator, partition_size), dtype)
+        if not len(partition):
+            return
+        yield partition
+
+
+def _split_array(dump, partition_size, iterable, key=None, reverse=False, dtype=float,
+                 batch_size=_BATCH_SIZE):
+    """
+    Split an array or an iterable of numeric values into sorted arrays of partition_size values
+    and serialize using the dump callable. The last array is kept in memory.
+
+    The arrays are always serialized in ascending order, when reverse is set they are loaded
+    from the end.
+
+    :param dump:           Callable which takes an array and serializes it.
+
+    :param partition_size: The number of values to place in each array.
+
+    :param iterable:       An array or an iterable of numeric values.
+
+    :param key:            Not supported, the values are compared directly.
+
+    :param reverse:        If set to ``True``, the last array is kept in descending order.
+
+    :param dtype:          The dtype of the arrays.
+
+    :param batch_size:     The number of values in each batch of the array kept in memory.
+
+    :return: list of the ids which can be used to reload the arrays.
+    """
+    if key is not None:
+        raise ValueError('key is not supported when sorting arrays, values are compared directly')
+    if isinstance(iterable, np.ndarray):
+        iterable = iterable.ravel()
+        partitions = (iterable[i:i + partition_size]
+                      for i in range(0, len(iterable), partition_size))
+    else:
+        partitions = _fromiter(partition_size, iterable, dtype)
+    partition_ids = []
+    previous = None
+    for partition in partitions:
+        if previous is not None:
+            partition_ids.append(dump(previous))
+        previous = np.sort(partition.astype(dtype, copy=False), kind='stable')
+    if previous is not None:
+        partition_ids.append(_Resident(list(_batches(previous, batch_size, reverse))))
+    return partition_ids
+
+
+def _take_merged(batches, cutoff, reverse):
+    """
+    Take the values from the front of each batch which are not after cutoff in sorted order.
+
+    :param batches: List of sorted arrays, which is updated with the values which remain.
+
+    :param cutoff:  The last value which can be output in this step of the merge.
+
+    :param reverse: ``True`` if the batches are in descending order.
+
+    :return: list of arrays of the values taken.
+    """
+    taken = []
+    for i, batch in enumerate(batches):
+        if reverse:
+            n = len(batch) - np.searchsorted(batch[::-1], cutoff, side='left')
+        else:
+            n = np.searchsorted(batch, cutoff, side='right')
+        taken.append(batch[:n])
+        batches[i] = batch[n:]
+    return taken
+
+
+def _merge_arrays(load, partition_ids, key=None, reverse=False):
+    """
+    Merge sorted arrays in vectorized steps.
+
+    In each step the smallest of the last values of the current batch of each array is used as a
+    cutoff, every value which is not after the cutoff is taken from each batch and the values taken
+    are sorted together. At least one batch is consumed entirely in each step.
+
+    :param load:          Callable which loads and returns an iterable of the batches of an
+                          array.
+
+    :param partition_ids: Ids which can be used to reload the arrays.
+
+    :param key:           Not supported, the values are compared directly.
+
+    :param reverse:       ``True`` if load returns batches in descending order.
+
+    :return: iterable of sorted arrays.
+    """
+    streams, batches = [], []
+    for partition_id in partition_ids:
+        stream = iter(load(partition_id))
+        batch = next(stream, None)
+        if batch is not None:
+            streams.append(stream)
+            batches.append(batch)
+    while streams:
+        lasts = np.sort(np.array([batch[-1] for batch in batches]))
+        cutoff = lasts[-1] if reverse else lasts[0]
+        merged = np.sort(np.concatenate(_take_merged(batches, cutoff, reverse)), kind='stable')
+        yield merged[::-1] if reverse else merged
+        for i in reversed(range(len(batches))):
+            if not len(batches[i]):
+                batches[i] = next(streams[i], None)
+                if batches[i] is None:
+                    del batches[i], streams[i]
+
+
+def xsorted_array(iterable, dtype=None, reverse=False, batches=False,
+                  partition_size=_PARTITION_SIZE, batch_size=_BATCH_SIZE):
+    """
+    Return a new sorted iterable of the numeric values in iterable, using vectorized external
+    sorting.
+
+    >>> list(xsorted_array([3, 1, 2], dtype=int))
+    [1, 2, 3]
+
+    :param iterable:       An array or an iterable of numeric values.
+
+    :param dtype:          The dtype to sort the values as, the dtype of iterable if it is an
+                           array, otherwise ``float``.
+
+    :param reverse:        If set to ``True``, the values are sorted in descending order.
+
+    :param batches:        If set to ``True``, the sorted values are returned as an iterable of
+                           arrays rather than of python scalars.
+
+    :param partition_size: The number of values to sort in memory in each partition.
+
+    :param batch_size:     The number of values in each batch read from a partition.
+
+    :return: an iterable of the values of iterable in sorted order.
+    """
+    if dtype is None:
+        dtype = getattr(iterable, 'dtype', float)
+    xsorted_ = xsorter(
+        partition_size=partition_size,
+        dump=_dump_array,
+        load=partial(_load_array, batch_size=batch_size, reverse=reverse),
+        split=partial(_split_array, dtype=dtype, batch_size=batch_size),
+        merge=_merge_arrays,
+    )
+    merged = (batch for batch in xsorted_(iterable, reverse=reverse) if len(batch))
+    return merged if batches else chain.from_iterable(batch.tolist() for batch in merged)
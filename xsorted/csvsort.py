@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+External sorting of csv files by their columns.
+
+Rows are read with ``csv.reader`` and serialized as plain rows, the header is only stored once, and
+the sorted rows are written directly with ``csv.writer``.
+"""
+# future
+from __future__ import division, print_function, absolute_import
+# std
+import csv
+from functools import partial
+# local
+from xsorted import xsorter
+
+
+# default number of rows sorted in memory in each partition.
+_PARTITION_SIZE = 1 << 14
+
+
+def _column_index(header, column):
+    """
+    Get the index of a column.
+
+    :param header: List of the column names, or ``None`` if the file has no header.
+
+    :param column: The name or the index of the column.
+
+    :return: The index of the column.
+    """
+    if isinstance(column, int):
+        return column
+    if header is None:
+        raise ValueError('column {0!r} can only be given by name if the file has a header'.format(
+            column))
+    try:
+        return header.index(column)
+    except ValueError:
+        raise ValueError('column {0!r} is not one of {1}'.format(column, header))
+
+
+def _row_key(columns, row):
+    """
+    Sort key of a row.
+
+    :param columns: List of tuples of the index and the converter of each column to sort by, the
+                    converter is ``None`` for columns which are compared as strings.
+
+    :param row:     The row to get the key of.
+
+    :return: tuple of the converted values of the columns.
+    """
+    return tuple(row[index] if convert is None else convert(row[index])
+                 for index, convert in columns)
+
+
+def xsort_csv(fileobj_in, fileobj_out, columns, converters=None, reverse=False, header=True,
+              dialect='excel', partition_size=_PARTITION_SIZE, **fmtparams):
+    """
+    Sort the rows of a csv file by one or more columns.
+
+    :param fileobj_in:     File object to read the csv rows from.
+
+    :param fileobj_out:    File object to write the sorted csv rows to.
+
+    :param columns:        List of the names or indexes of the columns to sort by, names can only
+                           be used if the file has a header.
+
+    :param converters:     Dict mapping a column, by the same name or index as in columns, to a
+                           callable which converts the value of the column before it is
+                           compared, for example ``int``. Columns without a converter are
+                           compared as strings.
+
+    :param reverse:        If set to ``True``, the rows are sorted in descending order.
+
+    :param header:         If set to ``True``, the first row is a header which is written to
+                           fileobj_out before the sorted rows.
+
+    :param dialect:        ``csv`` dialect used to read and write the rows.
+
+    :param partition_size: The number of rows to sort in memory in each partition.
+
+    :param fmtparams:      Additional ``csv`` formatting parameters used to read and write the
+                           rows.
+    """
+    converters = converters or {}
+    reader = csv.reader(fileobj_in, dialect, **fmtparams)
+    writer = csv.writer(fileobj_out, dialect, **fmtparams)
+    names = next(reader, None) if header else None
+    if names is not None:
+        writer.writerow(names)
+    columns = [(_column_index(names, column), converters.get(column)) for column in columns]
+    xsorted_ = xsorter(partition_size=partition_size)
+    writer.writerows(xsorted_(reader, key=partial(_row_key, columns), reverse=reverse))
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+External sort-merge join of two iterables which may be too large to fit in memory.
+
+Both sides are sorted by their join key using ``xsorter`` and the sorted streams are merged in a
+single pass. Only the group of right items with the current key is buffered, and groups with more
+than group_size items are spilled to a temporary file which is re-read for each matching left
+item.
+"""
+# future
+from __future__ import division, print_function, absolute_import
+# std
+import os
+import tempfile
+from itertools import groupby
+# local
+from xsorted import xsorter, _read_blocks, _write_blocks
+
+
+# default number of items of a group kept in memory before the group is spilled to disk.
+_GROUP_SIZE = 1 << 14
+# the ways in which the items of left and right can be joined.
+_HOW = frozenset(['inner', 'left', 'right', 'outer'])
+# marks the end of the groups of one of the sides.
+_END = object()
+
+
+class _GroupBuffer(object):
+    """
+    Buffer of the items of a group which can be iterated any number of times. At most max_items
+    items are kept in memory, the rest are spilled to a temporary file.
+    """
+
+    def __init__(self, items, max_items=_GROUP_SIZE):
+        self.items = []
+        self.max_items = max_items
+        self.fileobj = None
+        for item in items:
+            if len(self.items) >= max_items:
+                self._spill()
+            self.items.append(item)
+
+    def _spill(self):
+        if self.fileobj is None:
+            self.fileobj = tempfile.TemporaryFile()
+        self.fileobj.seek(0, os.SEEK_END)
+        _write_blocks(self.fileobj, self.items)
+        self.items = []
+
+    def __iter__(self):
+        if self.fileobj is not None:
+            self.fileobj.seek(0)
+            for block in _read_blocks(self.fileobj):
+                for item in block:
+                    yield item
+        for item in self.items:
+            yield item
+
+    def close(self):
+        if self.fileobj is not None:
+            self.fileobj.close()
+
+
+def _sorted_groups(xsorted_, iterable, key):
+    """
+    Sort iterable and group the sorted items by key.
+
+    :return: iterator of (key, group) pairs.
+    """
+    return groupby(xsorted_(iterable, key=key), key)
+
+
+def _join(left_groups, right_groups, how, group_size):
+    """
+    Join two iterables of (key, group) pairs which are sorted by key.
+
+    :return: iterable of (left item, right item) pairs.
+    """
+    keep_left, keep_right = how in ('left', 'outer'), how in ('right', 'outer')
+    left_key, left_group = next(left_groups, (_END, None))
+    right_key, right_group = next(right_groups, (_END, None))
+    while left_key is not _END and right_key is not _END:
+        if left_key < right_key:
+            if keep_left:
+                for item in left_group:
+                    yield item, None
+            left_key, left_group = next(left_groups, (_END, None))
+        elif right_key < left_key:
+            if keep_right:
+                for item in right_group:
+                    yield None, item
+            right_key, right_group = next(right_groups, (_END, None))
+        else:
+            buffered = _GroupBuffer(right_group, group_size)
+            try:
+                for left_item in left_group:
+                    for right_item in buffered:
+                        yield left_item, right_item
+            finally:
+                buffered.close()
+            left_key, left_group = next(left_groups, (_END, None))
+            right_key, right_group = next(right_groups, (_END, None))
+    while keep_left and left_key is not _END:
+        for item in left_group:
+            yield item, None
+        left_key, left_group = next(left_groups, (_END, None))
+    while keep_right and right_key is not _END:
+        for item in right_group:
+            yield None, item
+        right_key, right_group = next(right_groups, (_END, None))
+
+
+def xjoin(left, right, left_key, right_key=None, how='inner', group_size=_GROUP_SIZE,
+          **options):
+    """
+    Join the items of two iterables which have equal keys, like a database join. Each side is
+    sorted externally and the joined pairs are returned in order of their key.
+
+    >>> list(xjoin([(1, 'a'), (2, 'b')], [(2, 'c'), (3, 'd')], lambda x: x[0], how='outer'))
+    [((1, 'a'), None), ((2, 'b'), (2, 'c')), (None, (3, 'd'))]
+
+    :param left:       The left iterable to join.
+
+    :param right:      The right iterable to join.
+
+    :param left_key:   Specifies a function of one argument that is used to extract the join key
+                       from each left item.
+
+    :param right_key:  Specifies a function of one argument that is used to extract the join key
+                       from each right item, left_key if not set.
+
+    :param how:        One of ``'inner'``, ``'left'``, ``'right'`` or ``'outer'``. Items without a
+                       match are paired with ``None`` if they are from a side which is kept.
+
+    :param group_size: The number of right items with the same key kept in memory, larger groups
+                       are spilled to disk.
+
+    :param options:    Additional options used to create the xsorted function which sorts each
+                       side, see ``xsorter``.
+
+    :return: iterable of (left item, right item) pairs.
+    """
+    if how not in _HOW:
+        raise ValueError('how should be one of {0}, got {1!r}'.format(', '.join(sorted(_HOW)), how))
+    right_key = left_key if right_key is None else right_key
+    xsorted_ = xsorter(**options)
+    return _join(_sorted_groups(xsorted_, left, left_key),
+                 _sorted_groups(xsorted_, right, right_key), how, group_size)
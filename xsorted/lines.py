@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+External sorting of the lines of text files, like unix ``sort``.
+
+Lines are handled as raw bytes without their line terminator, they are read using large buffered
+reads which are split into lines in one call, and partitions are written as newline delimited
+bytes rather than being pickled.
+"""
+# future
+from __future__ import division, print_function, absolute_import
+# std
+import os
+import tempfile
+from functools import partial
+from itertools import chain
+# local
+from xsorted import xsorter, _partition
+
+
+# default number of lines sorted in memory in each partition.
+_PARTITION_SIZE = 1 << 18
+# default number of bytes read at a time.
+_BUFFER_SIZE = 1 << 20
+# default number of lines written at a time.
+_BLOCK_SIZE = 1 << 12
+
+
+def _read_lines(fileobj, buffer_size=_BUFFER_SIZE):
+    """
+    Read the lines of fileobj, buffer_size bytes at a time. A last line which is not terminated by
+    a newline is returned like any other line.
+
+    :param fileobj:     File object opened for reading in binary mode.
+
+    :param buffer_size: The number of bytes to read at a time.
+
+    :return: iterable of lists of lines, without their newlines.
+    """
+    remainder = b''
+    while True:
+        data = fileobj.read(buffer_size)
+        if not data:
+            if remainder:
+                yield [remainder]
+            return
+        lines = (remainder + data).split(b'\n')
+        remainder = lines.pop()
+        yield lines
+
+
+def _write_lines(fileobj, lines, block_size=_BLOCK_SIZE):
+    """
+    Write lines to fileobj each terminated by a newline, block_size lines at a time.
+
+    :param fileobj:    File object opened for writing in binary mode.
+
+    :param lines:      Iterable of lines, without their newlines.
+
+    :param block_size: The number of lines to write at a time.
+    """
+    for block in _partition(block_size, lines):
+        block.append(b'')
+        fileobj.write(b'\n'.join(block))
+
+
+def _dump_lines(partition, block_size=_BLOCK_SIZE):
+    """
+    Dump a partition of lines to a temporary file as newline delimited bytes.
+
+    :param partition:  Iterable of lines, without their newlines.
+
+    :param block_size: The number of lines to write at a time.
+
+    :return: The path to the temporary file.
+    """
+    with tempfile.NamedTemporaryFile(delete=False) as fileobj:
+        _write_lines(fileobj, partition, block_size)
+        return fileobj.name
+
+
+def _load_lines(partition_id, buffer_size=_BUFFER_SIZE):
+    """
+    Load the lines dumped by ``_dump_lines``. After all lines have been loaded the temporary file
+    is removed.
+
+    :param partition_id: The path to the temporary file.
+
+    :param buffer_size:  The number of bytes to read at a time.
+
+    :return: iterable of lines, without their newlines.
+    """
+    try:
+        with open(partition_id, 'rb') as fileobj:
+            for lines in _read_lines(fileobj, buffer_size):
+                for line in lines:
+                    yield line
+    finally:
+        os.unlink(partition_id)
+
+
+def _decoded_key(key, encoding, line):
+    """
+    Sort key which decodes line before calling key.
+    """
+    return key(line.decode(encoding))
+
+
+def xsort_lines(path_in, path_out, key=None, encoding=None, reverse=False,
+                partition_size=_PARTITION_SIZE, buffer_size=_BUFFER_SIZE):
+    """
+    Sort the lines of a text file into another file.
+
+    Without a key lines are compared by their bytes, like unix ``sort`` with ``LC_ALL=C``. Every
+    line of the output is terminated by a newline, including the last.
+
+    :param path_in:        The path of the file to sort.
+
+    :param path_out:       The path of the file to write the sorted lines to.
+
+    :param key:            Specifies a function of one argument that is used to extract a
+                           comparison key from each line. The line is passed as bytes, without
+                           it's newline, unless encoding is set.
+
+    :param encoding:       If set, the encoding used to decode each line before it is passed to
+                           key. The lines themselves are written to path_out as they were read.
+
+    :param reverse:        If set to ``True``, the lines are sorted in descending order.
+
+    :param partition_size: The number of lines to sort in memory in each partition.
+
+    :param buffer_size:    The number of bytes to read at a time.
+    """
+    if key is not None and encoding is not None:
+        key = partial(_decoded_key, key, encoding)
+    xsorted_ = xsorter(
+        partition_size=partition_size,
+        dump=_dump_lines,
+        load=partial(_load_lines, buffer_size=buffer_size),
+    )
+    with open(path_in, 'rb') as fileobj_in, open(path_out, 'wb') as fileobj_out:
+        lines = chain.from_iterable(_read_lines(fileobj_in, buffer_size))
+        _write_lines(fileobj_out, xsorted_(lines, key=key, reverse=reverse))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+External sorting of binary files made of fixed size records.
+
+The input file is memory mapped and each record is a zero copy ``memoryview`` slice of the map,
+the records are sorted using a key unpacked with ``struct`` directly from the record bytes and the
+partitions and the output are written as raw bytes, so records are never unpacked into python
+objects. Since ``memoryview`` objects can not be ordered, records which are sorted by their bytes
+rather than by key fields are copied to ``bytes`` to be compared.
+"""
+# future
+from __future__ import division, print_function, absolute_import
+# std
+import os
+import mmap
+import struct
+import tempfile
+from functools import partial
+# local
+from xsorted import xsorter, _partition
+
+
+# default number of records sorted in memory in each partition.
+_PARTITION_SIZE = 1 << 16
+# default number of records read and written at a time.
+_BLOCK_SIZE = 1 << 10
+
+
+def _write_records(fileobj, records, block_size=_BLOCK_SIZE):
+    """
+    Write records to fileobj as raw bytes, block_size records at a time.
+
+    :param fileobj:    File object opened for writing in binary mode.
+
+    :param records:    Iterable of bytes like records.
+
+    :param block_size: The number of records to write at a time.
+    """
+    for block in _partition(block_size, records):
+        fileobj.write(b''.join(block))
+
+
+def _dump_records(partition, block_size=_BLOCK_SIZE):
+    """
+    Dump a partition of records to a temporary file as raw bytes.
+
+    :param partition:  Iterable of bytes like records.
+
+    :param block_size: The number of records to write at a time.
+
+    :return: The path to the temporary file.
+    """
+    with tempfile.NamedTemporaryFile(delete=False) as fileobj:
+        _write_records(fileobj, partition, block_size)
+        return fileobj.name
+
+
+def _load_records(partition_id, record_size, block_size=_BLOCK_SIZE):
+    """
+    Load the records dumped by ``_dump_records``, block_size records at a time. After all records
+    have been loaded the temporary file is removed.
+
+    :param partition_id: The path to the temporary file.
+
+    :param record_size:  The size of each record in bytes.
+
+    :param block_size:   The number of records to read at a time.
+
+    :return: iterable of ``memoryview`` records.
+    """
+    try:
+        with open(partition_id, 'rb') as fileobj:
+            while True:
+                data = fileobj.read(block_size * record_size)
+                if not data:
+                    return
+                view = memoryview(data)
+                for offset in range(0, len(data), record_size):
+                    yield view[offset:offset + record_size]
+    finally:
+        os.unlink(partition_id)
+
+
+def _release(mapped, view):
+    """
+    Release the view of a memory map and close the map.
+    """
+    view.release()
+    mapped.close()
+
+
+def _unpack_key(unpack_from, key_offset, record):
+    """
+    Unpack the key fields of a record, used as the sort key.
+
+    :return: tuple of the fields unpacked from record at key_offset.
+    """
+    return unpack_from(record, key_offset)
+
+
+def xsort_records(path_in, path_out, record_size, key_format=None, key_offset=0, reverse=False,
+                  partition_size=_PARTITION_SIZE, block_size=_BLOCK_SIZE):
+    """
+    Sort a binary file made of fixed size records into another file.
+
+    :param path_in:        The path of the file to sort.
+
+    :param path_out:       The path of the file to write the sorted records to.
+
+    :param record_size:    The size of each record in bytes.
+
+    :param key_format:     ``struct`` format of the fields to sort by, for example ``'>I'`` for a
+                           big endian unsigned integer. If not set, records are sorted by their
+                           bytes, which are copied to compare them.
+
+    :param key_offset:     The offset of the key fields from the start of each record.
+
+    :param reverse:        If set to ``True``, the records are sorted in descending order.
+
+    :param partition_size: The number of records to sort in memory in each partition.
+
+    :param block_size:     The number of records to read and write at a time.
+    """
+    if key_format is None:
+        key = bytes
+    else:
+        key_struct = struct.Struct(key_format)
+        if key_offset + key_struct.size > record_size:
+            raise ValueError('key of {0} bytes at offset {1} does not fit in a record of {2} '
+                             'bytes'.format(key_struct.size, key_offset, record_size))
+        key = partial(_unpack_key, key_struct.unpack_from, key_offset)
+    size = os.path.getsize(path_in)
+    if size % record_size:
+        raise ValueError('size of {0} ({1} bytes) is not a multiple of the record size {2}'.format(
+            path_in, size, record_size))
+    xsorted_ = xsorter(
+        partition_size=partition_size,
+        dump=partial(_dump_records, block_size=block_size),
+        load=partial(_load_records, record_size=record_size, block_size=block_size),
+    )
+    with open(path_in, 'rb') as fileobj_in, open(path_out, 'wb') as fileobj_out:
+        if not size:
+            return
+        mapped = mmap.mmap(fileobj_in.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            records = (view[offset:offset + record_size] for offset in range(0, size, record_size))
+            _write_records(fileobj_out, xsorted_(records, key=key, reverse=reverse), block_size)
+            del records
+        except BaseException:
+            try:
+                _release(mapped, view)
+            except BufferError:
+                # records are still referenced by the traceback, the map is closed when they are
+                # collected rather than hiding the original exception.
+                pass
+            raise
+        _release(mapped, view)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""
+Persistent storage of the output of an external sort, which can be queried by key any number of
+times without sorting again.
+
+The sorted items are written to a data file in the block format of ``_dump``, and a sparse index
+of the first key and the offset of each block is written alongside it. A lookup finds the first
+block which can hold the key using a binary search of the index, and only reads blocks from there
+on for as long as they are needed.
+"""
+# future
+from __future__ import division, print_function, absolute_import
+# std
+import os
+import pickle
+from bisect import bisect_left
+from itertools import dropwhile, takewhile
+# local
+from xsorted import xsorter, _partition, _read_blocks, _write_blocks
+
+
+# default number of items in each block of the data file.
+_BLOCK_SIZE = 1 << 10
+# names of the files of a store.
+_DATA, _INDEX = 'data', 'index'
+
+
+def _identity(item):
+    """
+    Key of items which are compared directly.
+    """
+    return item
+
+
+class SortedStore(object):
+    """
+    Sorted items stored on disk by ``xsort_to_store``, with a sparse index of the first key of each
+    block.
+
+    :param path: The directory the store was written to.
+
+    :param key:  The key the items were sorted by, which must be the same as when the store was
+                 written.
+    """
+
+    def __init__(self, path, key=None):
+        self.path = path
+        self.key = _identity if key is None else key
+        with open(os.path.join(path, _INDEX), 'rb') as fileobj:
+            self.size, self.first_keys, self.offsets = pickle.load(fileobj)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return self._items(0)
+
+    def _items(self, block):
+        """
+        Read the items of the data file starting from the beginning of a block.
+
+        :param block: The index of the block to start from.
+
+        :return: iterable of items.
+        """
+        if block >= len(self.offsets):
+            return
+        with open(os.path.join(self.path, _DATA), 'rb') as fileobj:
+            fileobj.seek(self.offsets[block])
+            for items in _read_blocks(fileobj):
+                for item in items:
+                    yield item
+
+    def seek(self, key):
+        """
+        Get the items starting from the first item which has a key not less than key.
+
+        :param key: The key to seek to.
+
+        :return: iterable of the items from key onwards in sorted order.
+        """
+        # items with the key may also be at the end of the block before the first block which
+        # starts with a key not less than key.
+        block = max(bisect_left(self.first_keys, key) - 1, 0)
+        return dropwhile(lambda item: self.key(item) < key, self._items(block))
+
+    def range(self, lo, hi):
+        """
+        Get the items which have a key not less than lo and less than hi.
+
+        :param lo: The lower bound of the keys, inclusive.
+
+        :param hi: The upper bound of the keys, exclusive.
+
+        :return: iterable of the items in the range in sorted order.
+        """
+        return takewhile(lambda item: self.key(item) < hi, self.seek(lo))
+
+
+def xsort_to_store(iterable, path, key=None, block_size=_BLOCK_SIZE, **options):
+    """
+    Sort iterable and store the sorted items in a directory so that they can be queried by key.
+
+    >>> import tempfile
+    >>> store = xsort_to_store([5, 3, 9, 1, 7], tempfile.mkdtemp(), block_size=2)
+    >>> list(store.range(3, 9))
+    [3, 5, 7]
+
+    :param iterable:   The iterable to sort.
+
+    :param path:       The directory to write the store to, which is created if it does not
+                       exist.
+
+    :param key:        Specifies a function of one argument that is used to extract a comparison
+                       key from each item.
+
+    :param block_size: The number of items in each block of the data file, smaller blocks make
+                       the index larger but each lookup reads fewer items.
+
+    :param options:    Additional options used to create the xsorted function, see ``xsorter``.
+
+    :return: ``SortedStore`` of the sorted items.
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    store_key = _identity if key is None else key
+    size, first_keys, offsets = 0, [], []
+    with open(os.path.join(path, _DATA), 'wb') as fileobj:
+        for block in _partition(block_size, xsorter(**options)(iterable, key=key)):
+            size += len(block)
+            first_keys.append(store_key(block[0]))
+            offsets.append(fileobj.tell())
+            _write_blocks(fileobj, block, block_size)
+    with open(os.path.join(path, _INDEX), 'wb') as fileobj:
+        pickle.dump((size, first_keys, offsets), fileobj, pickle.HIGHEST_PROTOCOL)
+    return SortedStore(path, key)